@@ -3,521 +3,553 @@ FastAPI Web Application for MLOPS Data Visualization Dashboard
 ================================================================
 
 This application provides a web-based dashboard to visualize shopping data analysis results.
-It uses Seaborn and Matplotlib for static chart generation.
+It serves Plotly figure JSON that the browser renders client-side.
 
 Author: AI Assistant
 Date: 2025-09-30
 """
 
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, Response
+from fastapi.staticfiles import StaticFiles
 from pathlib import Path
 import pandas as pd
-import seaborn as sns
-import matplotlib.pyplot as plt
-import io
-import base64
+import pyarrow.compute as pc
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+import plotly.io as pio
+from plotly.colors import get_colorscale
+import asyncio
+import gzip
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import os
+import orjson
+
+ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered with orjson, which also serializes numpy scalars and arrays natively."""
+    
+    def render(self, content):
+        return orjson.dumps(content, option=ORJSON_OPTIONS)
 
 app = FastAPI(
     title="MLOPS Shopping Data Analytics Dashboard",
-    description="Interactive web dashboard for shopping data analysis and visualization using Seaborn",
-    version="2.0.0"
+    description="Interactive web dashboard for shopping data analysis and visualization using Plotly",
+    version="2.0.0",
+    default_response_class=ORJSONResponse
 )
 
-# Configuration
-RESULTS_PATH = Path("results")
-sns.set_theme(style="whitegrid") # Set a nice theme for all plots
-
-# Data cache
+# Configuration (anchored to this file, so the app imports and serves from any working directory)
+APP_DIR = Path(__file__).resolve().parent
+RESULTS_PATH = APP_DIR / "results"
+STATIC_PATH = APP_DIR / "static"
+# Worker processes each hold their own cache and /api/reload only refreshes one, so more than one is opt-in
+DASHBOARD_WORKERS = int(os.environ.get("DASHBOARD_WORKERS", 1))
+# Clean theme for all charts; the figures are built as plain dicts, so the template is embedded in each layout
+PLOTLY_TEMPLATE = pio.templates["plotly_white"].to_plotly_json()
+
+# Display order of the seasonal chart's labels
+SEASON_ORDER = ['Spring', 'Summer', 'Fall', 'Winter']
+WEEKDAY_ORDER = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+# 2x2 chart grid cells in row-major order as (x domain, y domain), matching make_subplots' default spacing
+GRID_DOMAINS = [
+    ([0.0, 0.45], [0.625, 1.0]), ([0.55, 1.0], [0.625, 1.0]),
+    ([0.0, 0.45], [0.0, 0.375]), ([0.55, 1.0], [0.0, 0.375]),
+]
+
+# Analysis tables loaded into the cache (written by the pipeline as Parquet)
+DATASETS = [
+    'daily_sales',
+    'regional_daily_sales',
+    'overall_daily_sales',
+    'mall_profitability',
+    'category_profitability',
+    'seasonal_trends',
+    'weekly_patterns',
+    'payment_analysis',
+    'monthly_trends',
+    'payment_by_region',
+    'payment_by_category',
+]
+
+# Columns stored as timestamps once the tables are in Parquet
+DATE_COLUMNS = {
+    'daily_sales': ['invoice_date'],
+    'regional_daily_sales': ['invoice_date'],
+    'overall_daily_sales': ['invoice_date'],
+}
+
+# Columns the chart endpoints actually read; tables served as-is by /api/data/* load in full
+REQUIRED_COLS = {
+    'regional_daily_sales': ['invoice_date', 'Region', 'total_revenue'],
+    'seasonal_trends': ['season', 'total_revenue', 'total_transactions'],
+    'weekly_patterns': ['weekday_name', 'total_revenue'],
+    'monthly_trends': ['year_month', 'total_revenue'],
+}
+
+# Low-cardinality labels repeated on every row, read dictionary-encoded and held as categoricals in data_cache
+CATEGORICAL_COLUMNS = ['Region', 'shopping_mall', 'category', 'payment_method', 'season', 'weekday_name']
+
+# Uncompressed Arrow IPC copies of the tables, memory-mapped on reload
+ARROW_CACHE_PATH = RESULTS_PATH / ".arrow_cache"
+
+# Data cache (pandas views for charts, Arrow tables for aggregations)
 data_cache = {}
+arrow_cache = {}
+# Chart-ready orderings and per-region groupings of the loaded tables, built once per load
+derived_cache = {}
+
+# Serialized /api/summary and /api/data/* bodies with their gzip-compressed copies and ETags, built once per load
+RECORD_TABLES = ['mall_profitability', 'category_profitability', 'payment_analysis']
+PAYLOAD_CACHE = {}
+PAYLOAD_GZIP = {}
+PAYLOAD_ETAGS = {}
+
+# Pre-built chart responses keyed by chart name, with their gzip-compressed copies and ETags
+CHART_CACHE = {}
+CHART_GZIP = {}
+CHART_ETAGS = {}
+
+# Held for a whole (re)load so concurrent reloads never interleave their builds
+_cache_lock = asyncio.Lock()
+
+def make_etag(body):
+    """Build a strong ETag from a response body."""
+    return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+# API responses may be stored but must be revalidated (ETag/304), so a reload shows up on the next fetch
+API_CACHE_CONTROL = "public, no-cache"
+
+@app.middleware("http")
+async def etag_middleware(request: Request, call_next):
+    """Add ETag/Cache-Control to GET /api/ responses and answer a matching If-None-Match with 304."""
+    response = await call_next(request)
+    if request.method != "GET" or not request.url.path.startswith("/api/") or response.status_code != 200:
+        return response
+    
+    # Pre-built charts and payloads carry an ETag computed at load time; anything else is hashed here
+    etag = response.headers.get("etag")
+    if etag is None:
+        body = b"".join([chunk async for chunk in response.body_iterator])
+        etag = make_etag(body)
+        response = Response(content=body, status_code=response.status_code, headers=dict(response.headers))
+        response.headers["ETag"] = etag
+    
+    if "cache-control" not in response.headers:
+        response.headers["Cache-Control"] = API_CACHE_CONTROL
+    
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in (tag.strip() for tag in if_none_match.split(",")):
+        headers = {"ETag": etag, "Cache-Control": response.headers["cache-control"]}
+        if "vary" in response.headers:
+            headers["Vary"] = response.headers["vary"]
+        return Response(status_code=304, headers=headers)
+    
+    return response
 
-def fig_to_base64(fig):
-    """Convert a matplotlib figure to a base64 encoded image."""
-    buf = io.BytesIO()
-    fig.savefig(buf, format='png', bbox_inches='tight')
-    buf.seek(0)
-    base64_img = base64.b64encode(buf.read()).decode('utf-8')
-    plt.close(fig) # Close the figure to free memory
-    return f"data:image/png;base64,{base64_img}"
+# Chart and payload routes serve their own precompressed bodies (see encoded_response)
+PRECOMPRESSED_PREFIXES = ("/api/charts/", "/api/data/", "/api/summary")
 
-def load_data():
+class PrecompressedSkippingGZipMiddleware(GZipMiddleware):
+    """GZip responses except the precompressed routes, which older Starlette releases would compress a second time."""
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"].startswith(PRECOMPRESSED_PREFIXES):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+# Registered after the ETag middleware so it wraps it: ETags are taken on the uncompressed body
+app.add_middleware(PrecompressedSkippingGZipMiddleware, minimum_size=1024, compresslevel=5)
+
+def figure_json(data, layout):
+    """Serialize a hand-built Plotly figure spec to JSON bytes for the browser to render."""
+    return orjson.dumps({'data': data, 'layout': layout}, option=ORJSON_OPTIONS)
+
+def axis_title(text, **axis):
+    """Axis settings with a title"""
+    return {'title': {'text': text}, **axis}
+
+def ensure_parquet(name):
+    """Return the Parquet path for a table, migrating the pipeline's legacy CSV on first use."""
+    parquet_path = RESULTS_PATH / f"{name}.parquet"
+    csv_path = RESULTS_PATH / f"{name}.csv"
+    
+    if parquet_path.exists() and (not csv_path.exists() or parquet_path.stat().st_mtime >= csv_path.stat().st_mtime):
+        return parquet_path
+    
+    # One-time migration: parse the CSV (including dates) and persist it as Parquet
+    df = pd.read_csv(csv_path, dtype=dict.fromkeys(CATEGORICAL_COLUMNS, 'category'),
+                     parse_dates=DATE_COLUMNS.get(name, []), date_format='%Y-%m-%d')
+    # Workers may migrate together, so write under a per-process name and rename into place
+    tmp_path = parquet_path.with_suffix(f".{os.getpid()}.tmp")
+    df.to_parquet(tmp_path, engine='pyarrow', compression='zstd', index=False)
+    os.replace(tmp_path, parquet_path)
+    return parquet_path
+
+def read_result(name):
+    """Read the needed columns of one table as Arrow, memory-mapping the Feather cache when it is fresh."""
+    parquet_path = ensure_parquet(name)
+    feather_path = ARROW_CACHE_PATH / f"{name}.feather"
+    
+    columns = REQUIRED_COLS.get(name)
+    
+    if feather_path.exists() and feather_path.stat().st_mtime >= parquet_path.stat().st_mtime:
+        return feather.read_table(feather_path, columns=columns, memory_map=True)
+    
+    # The cache keeps every column so REQUIRED_COLS can change without invalidating it
+    # Label columns come back dictionary-encoded, so to_pandas() yields categoricals without re-hashing strings
+    table = pq.read_table(parquet_path, read_dictionary=CATEGORICAL_COLUMNS)
+    ARROW_CACHE_PATH.mkdir(exist_ok=True)
+    # Workers start together, so write under a per-process name and rename: readers never see a partial file
+    tmp_path = feather_path.with_suffix(f".{os.getpid()}.tmp")
+    feather.write_feather(table, tmp_path, compression='uncompressed')
+    os.replace(tmp_path, feather_path)
+    # Serve from the mapping too, so every worker shares the same page-cache copy of the table
+    return feather.read_table(feather_path, columns=columns, memory_map=True)
+
+def optimize_dtypes(df):
+    """Convert label columns to categoricals and downcast integer columns to the smallest width."""
+    # Floats stay float64: the cent-rounded values are not exact in float32 and would leak into /api/data/*
+    for column in df.columns:
+        if column in CATEGORICAL_COLUMNS:
+            df[column] = df[column].astype('category')
+        elif pd.api.types.is_integer_dtype(df[column]):
+            df[column] = pd.to_numeric(df[column], downcast='integer')
+    return df
+
+def load_result(name):
+    """Read one result as an Arrow table plus its optimized pandas view"""
+    table = read_result(name)
+    # The Arrow tables stay cached for compute kernels, so the pandas view must not self-destruct them
+    return table, optimize_dtypes(table.to_pandas(zero_copy_only=False))
+
+async def load_data():
     """Load all analysis results into memory"""
-    global data_cache
+    global data_cache, arrow_cache, PAYLOAD_CACHE, PAYLOAD_GZIP, PAYLOAD_ETAGS, CHART_CACHE, CHART_GZIP, CHART_ETAGS
     
-    try:
-        data_cache = {
-            'daily_sales': pd.read_csv(RESULTS_PATH / "daily_sales.csv"),
-            'regional_daily_sales': pd.read_csv(RESULTS_PATH / "regional_daily_sales.csv"),
-            'mall_profitability': pd.read_csv(RESULTS_PATH / "mall_profitability.csv"),
-            'category_profitability': pd.read_csv(RESULTS_PATH / "category_profitability.csv"),
-            'seasonal_trends': pd.read_csv(RESULTS_PATH / "seasonal_trends.csv"),
-            'weekly_patterns': pd.read_csv(RESULTS_PATH / "weekly_patterns.csv"),
-            'payment_analysis': pd.read_csv(RESULTS_PATH / "payment_analysis.csv"),
-            'monthly_trends': pd.read_csv(RESULTS_PATH / "monthly_trends.csv"),
-            'payment_by_region': pd.read_csv(RESULTS_PATH / "payment_by_region.csv"),
-            'payment_by_category': pd.read_csv(RESULTS_PATH / "payment_by_category.csv"),
-        }
-        
-        # Convert date columns
-        data_cache['daily_sales']['invoice_date'] = pd.to_datetime(data_cache['daily_sales']['invoice_date'])
-        data_cache['regional_daily_sales']['invoice_date'] = pd.to_datetime(data_cache['regional_daily_sales']['invoice_date'])
+    async with _cache_lock:
+        try:
+            # Arrow file reads release the GIL, so the datasets load concurrently on a dedicated pool
+            # (one thread per dataset) rather than competing with request handlers for the default one
+            loop = asyncio.get_running_loop()
+            with ThreadPoolExecutor(max_workers=len(DATASETS), thread_name_prefix="load_data") as executor:
+                results = await asyncio.gather(*(loop.run_in_executor(executor, load_result, name) for name in DATASETS))
+            arrow_cache = {name: table for name, (table, _) in zip(DATASETS, results)}
+            data_cache = {name: df for name, (_, df) in zip(DATASETS, results)}
+            # Charts and payloads only change when the data does, so rebuild them on every (re)load,
+            # off the event loop so requests keep being served from the previous caches meanwhile
+            payloads = await asyncio.to_thread(render_payloads)
+            await asyncio.to_thread(build_derived)
+            charts = await asyncio.to_thread(render_charts)
+        except Exception as e:
+            print(f"Error loading data: {str(e)}")
+            return False
         
+        # Swap every served cache together, with no await in between, so a request sees
+        # either the previous set of bodies and ETags or the new one, never a mix
+        PAYLOAD_CACHE, PAYLOAD_GZIP, PAYLOAD_ETAGS = payloads
+        CHART_CACHE, CHART_GZIP, CHART_ETAGS = charts
         return True
-    except Exception as e:
-        print(f"Error loading data: {str(e)}")
-        return False
 
 @app.on_event("startup")
 async def startup_event():
     """Load data on application startup"""
-    success = load_data()
+    success = await load_data()
     if success:
         print("✓ Data loaded successfully!")
     else:
         print("✗ Failed to load data. Make sure to run the pipeline first.")
 
-@app.get("/", response_class=HTMLResponse)
-async def home():
-    """Main dashboard page"""
-    html_content = """
-    <!DOCTYPE html>
-    <html lang="en">
-    <head>
-        <meta charset="UTF-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <title>MLOPS Shopping Analytics Dashboard</title>
-        <style>
-            * {
-                margin: 0;
-                padding: 0;
-                box-sizing: border-box;
-            }
-            
-            body {
-                font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-                background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                min-height: 100vh;
-                padding: 20px;
-            }
-            
-            .container {
-                max-width: 1400px;
-                margin: 0 auto;
-            }
-            
-            .header {
-                background: white;
-                padding: 30px;
-                border-radius: 15px;
-                box-shadow: 0 10px 30px rgba(0,0,0,0.2);
-                margin-bottom: 30px;
-                text-align: center;
-            }
-            
-            .header h1 {
-                color: #667eea;
-                font-size: 2.5em;
-                margin-bottom: 10px;
-            }
-            
-            .header p {
-                color: #666;
-                font-size: 1.1em;
-            }
-            
-            .dashboard-grid {
-                display: grid;
-                grid-template-columns: repeat(auto-fit, minmax(350px, 1fr));
-                gap: 20px;
-                margin-bottom: 30px;
-            }
-            
-            .card {
-                background: white;
-                border-radius: 15px;
-                padding: 25px;
-                box-shadow: 0 5px 15px rgba(0,0,0,0.1);
-                transition: transform 0.3s ease, box-shadow 0.3s ease;
-            }
-            
-            .card:hover {
-                transform: translateY(-5px);
-                box-shadow: 0 10px 25px rgba(0,0,0,0.2);
-            }
-            
-            .card h2 {
-                color: #667eea;
-                margin-bottom: 15px;
-                font-size: 1.5em;
-                border-bottom: 2px solid #667eea;
-                padding-bottom: 10px;
-            }
-            
-            .chart-container {
-                background: white;
-                border-radius: 15px;
-                padding: 25px;
-                box-shadow: 0 5px 15px rgba(0,0,0,0.1);
-                margin-bottom: 30px;
-            }
-            
-            .chart-container img {
-                max-width: 100%;
-                height: auto;
-            }
-            
-            .nav-buttons {
-                display: flex;
-                gap: 15px;
-                flex-wrap: wrap;
-                justify-content: center;
-                margin-top: 20px;
-            }
-            
-            .nav-button {
-                background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                color: white;
-                padding: 12px 24px;
-                border: none;
-                border-radius: 25px;
-                cursor: pointer;
-                font-size: 1em;
-                transition: all 0.3s ease;
-                text-decoration: none;
-                display: inline-block;
-            }
-            
-            .nav-button:hover {
-                transform: scale(1.05);
-                box-shadow: 0 5px 15px rgba(102, 126, 234, 0.4);
-            }
-            
-            .loading {
-                text-align: center;
-                padding: 40px;
-                color: #666;
-                font-size: 1.2em;
-            }
-            
-            #summaryStats {
-                display: grid;
-                grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
-                gap: 15px;
-            }
-            
-            .stat-card {
-                background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                color: white;
-                padding: 20px;
-                border-radius: 10px;
-                text-align: center;
-            }
-            
-            .stat-value {
-                font-size: 2em;
-                font-weight: bold;
-                margin-bottom: 5px;
-            }
-            
-            .stat-label {
-                font-size: 0.9em;
-                opacity: 0.9;
-            }
-        </style>
-    </head>
-    <body>
-        <div class="container">
-            <div class="header">
-                <h1>🛍️ MLOPS Shopping Analytics Dashboard</h1>
-                <p>Interactive Data Visualization & Business Intelligence</p>
-            </div>
-            
-            <div class="dashboard-grid">
-                <div class="card">
-                    <h2>📊 Overview</h2>
-                    <div id="summaryStats" class="loading">Loading statistics...</div>
-                </div>
-            </div>
-            
-            <div class="chart-container">
-                <h2>💰 Profitability Analysis</h2>
-                <div id="profitabilityChart" class="loading">Loading chart...</div>
-            </div>
-            
-            <div class="chart-container">
-                <h2>📅 Seasonal & Weekly Trends</h2>
-                <div id="seasonalChart" class="loading">Loading chart...</div>
-            </div>
-            
-            <div class="chart-container">
-                <h2>💳 Payment Methods Analysis</h2>
-                <div id="paymentChart" class="loading">Loading chart...</div>
-            </div>
-            
-            <div class="chart-container">
-                <h2>📈 Regional Performance</h2>
-                <div id="regionalChart" class="loading">Loading chart...</div>
-            </div>
-            
-            <div class="nav-buttons">
-                <a href="/docs" class="nav-button">📚 API Documentation</a>
-                <button onclick="refreshData()" class="nav-button">🔄 Refresh Data</button>
-            </div>
-        </div>
-        
-        <script>
-            // Load summary statistics
-            async function loadSummaryStats() {
-                try {
-                    const response = await fetch('/api/summary');
-                    const data = await response.json();
-                    
-                    const statsHtml = `
-                        <div class="stat-card">
-                            <div class="stat-value">${data.total_malls}</div>
-                            <div class="stat-label">Shopping Malls</div>
-                        </div>
-                        <div class="stat-card">
-                            <div class="stat-value">${data.total_regions}</div>
-                            <div class="stat-label">Regions</div>
-                        </div>
-                        <div class="stat-card">
-                            <div class="stat-value">$${(data.total_revenue / 1000000).toFixed(2)}M</div>
-                            <div class="stat-label">Total Revenue</div>
-                        </div>
-                        <div class="stat-card">
-                            <div class="stat-value">${data.total_transactions.toLocaleString()}</div>
-                            <div class="stat-label">Transactions</div>
-                        </div>
-                    `;
-                    
-                    document.getElementById('summaryStats').innerHTML = statsHtml;
-                } catch (error) {
-                    console.error('Error loading summary:', error);
-                    document.getElementById('summaryStats').innerHTML = 'Failed to load stats.';
-                }
-            }
-            
-            // Generic function to load any chart
-            async function loadChart(endpoint, elementId) {
-                const chartContainer = document.getElementById(elementId);
-                chartContainer.innerHTML = '<div class="loading">Loading chart...</div>';
-                try {
-                    const response = await fetch(endpoint);
-                    const data = await response.json();
-                    chartContainer.innerHTML = `<img src="${data.image}" alt="Chart for ${elementId}">`;
-                } catch (error) {
-                    console.error(`Error loading chart for ${elementId}:`, error);
-                    chartContainer.innerHTML = 'Failed to load chart.';
-                }
-            }
-
-            // Refresh all data
-            function refreshData() {
-                loadSummaryStats();
-                loadChart('/api/charts/profitability', 'profitabilityChart');
-                loadChart('/api/charts/seasonal', 'seasonalChart');
-                loadChart('/api/charts/payment', 'paymentChart');
-                loadChart('/api/charts/regional', 'regionalChart');
-            }
-            
-            // Initial load
-            window.onload = refreshData;
-        </script>
-    </body>
-    </html>
-    """
-    return HTMLResponse(content=html_content)
-
 @app.get("/api/summary")
-async def get_summary():
+async def get_summary(request: Request):
     """Get summary statistics"""
-    if not data_cache:
-        raise HTTPException(status_code=503, detail="Data not loaded")
-    
-    mall_prof = data_cache['mall_profitability']
+    return payload_response('summary', request)
+
+def compute_summary():
+    """Aggregate the headline statistics from the mall profitability table"""
+    mall_prof = arrow_cache['mall_profitability']
     
     return {
-        "total_malls": len(mall_prof),
-        "total_regions": mall_prof['Region'].nunique(),
-        "total_revenue": float(mall_prof['net_revenue'].sum()),
-        "total_transactions": int(mall_prof['total_transactions'].sum()),
-        "avg_discount_rate": float(mall_prof['discount_rate'].mean())
+        "total_malls": mall_prof.num_rows,
+        "total_regions": len(pc.unique(mall_prof['Region'])),
+        "total_revenue": pc.sum(mall_prof['net_revenue']).as_py(),
+        "total_transactions": pc.sum(mall_prof['total_transactions']).as_py(),
+        "avg_discount_rate": pc.mean(mall_prof['discount_rate']).as_py()
     }
 
-@app.get("/api/charts/profitability")
-async def get_profitability_chart():
-    """Generate profitability charts"""
-    if not data_cache:
-        raise HTTPException(status_code=503, detail="Data not loaded")
+def build_derived():
+    """Sort, order and group the tables the charts read, once for every chart and resolution"""
+    global derived_cache
     
+    # Regions appear in the pie by their top mall's revenue, and in the regional legend in pipeline order
     mall_prof = data_cache['mall_profitability'].sort_values('net_revenue', ascending=False)
-    category_prof = data_cache['category_profitability'].sort_values('final_amount', ascending=False)
-    
-    fig, axes = plt.subplots(2, 2, figsize=(14, 12))
-    fig.suptitle('Profitability Dashboard', fontsize=18, weight='bold')
-
-    # Mall revenue
-    sns.barplot(data=mall_prof, x='net_revenue', y='shopping_mall', ax=axes[0, 0], palette='viridis')
-    axes[0, 0].set_title('Net Revenue by Mall')
-    axes[0, 0].set_xlabel('Net Revenue ($)')
-    axes[0, 0].set_ylabel('Shopping Mall')
-
-    # Discount rates
-    sns.barplot(data=mall_prof, x='discount_rate', y='shopping_mall', ax=axes[0, 1], palette='plasma')
-    axes[0, 1].set_title('Discount Rate by Mall')
-    axes[0, 1].set_xlabel('Average Discount Rate (%)')
-    axes[0, 1].set_ylabel('')
-
-    # Category revenue
-    sns.barplot(data=category_prof, x='final_amount', y='category', ax=axes[1, 0], palette='magma')
-    axes[1, 0].set_title('Revenue by Category')
-    axes[1, 0].set_xlabel('Total Revenue ($)')
-    axes[1, 0].set_ylabel('Category')
-
-    # Regional distribution
-    region_revenue = mall_prof.groupby('Region')['net_revenue'].sum()
-    axes[1, 1].pie(region_revenue, labels=region_revenue.index, autopct='%1.1f%%', startangle=90, colors=sns.color_palette('pastel'))
-    axes[1, 1].set_title('Regional Revenue Distribution')
-    
-    plt.tight_layout(rect=[0, 0.03, 1, 0.95])
-    
-    return JSONResponse(content={"image": fig_to_base64(fig)})
+    regional_daily = data_cache['regional_daily_sales']
+    derived_cache = {
+        'mall_profitability_sorted': mall_prof,
+        'category_profitability_sorted': data_cache['category_profitability'].sort_values('final_amount', ascending=False),
+        'seasonal_ordered': data_cache['seasonal_trends'].set_index('season').reindex(SEASON_ORDER),
+        'weekly_ordered': data_cache['weekly_patterns'].set_index('weekday_name').reindex(WEEKDAY_ORDER),
+        'region_revenue': mall_prof.groupby('Region', observed=True, sort=False)['net_revenue'].sum(),
+        'regional_by_region': dict(tuple(regional_daily.groupby('Region', observed=True, sort=False))),
+    }
 
-@app.get("/api/charts/seasonal")
-async def get_seasonal_chart():
-    """Generate seasonal analysis charts"""
-    if not data_cache:
-        raise HTTPException(status_code=503, detail="Data not loaded")
+def hbar(x, y, colorscale=None, **trace):
+    """Horizontal bar trace, optionally coloured by its own values"""
+    if colorscale is not None:
+        trace['marker'] = {'color': x, 'colorscale': get_colorscale(colorscale)}
+    return {'type': 'bar', 'orientation': 'h', 'x': x, 'y': y, **trace}
+
+def pie(labels, values, **trace):
+    """Pie trace with slices kept in data order"""
+    return {'type': 'pie', 'labels': labels, 'values': values, 'sort': False, 'textinfo': 'percent+label', **trace}
+
+def grid_figure(title, subplot_titles, cells, **layout):
+    """Assemble a 2x2 chart grid as Plotly figure JSON.
+
+    cells holds one dict per grid cell in row-major order: 'traces' plus, for cartesian cells,
+    'xaxis' and 'yaxis' settings; cells without axes are laid out as pie domains.
+    """
+    data = []
+    layout = {'template': PLOTLY_TEMPLATE, 'title': {'text': title}, 'annotations': [], **layout}
+    axis_number = 0
     
-    seasonal = data_cache['seasonal_trends']
-    weekly = data_cache['weekly_patterns']
-    monthly = data_cache['monthly_trends']
+    for (x_domain, y_domain), subplot_title, cell in zip(GRID_DOMAINS, subplot_titles, cells):
+        if 'xaxis' in cell:
+            axis_number += 1
+            suffix = str(axis_number) if axis_number > 1 else ''
+            layout[f'xaxis{suffix}'] = {'anchor': f'y{suffix}', 'domain': x_domain, **cell['xaxis']}
+            layout[f'yaxis{suffix}'] = {'anchor': f'x{suffix}', 'domain': y_domain, **cell['yaxis']}
+            data += [{**trace, 'xaxis': f'x{suffix}', 'yaxis': f'y{suffix}'} for trace in cell['traces']]
+        else:
+            data += [{**trace, 'domain': {'x': x_domain, 'y': y_domain}} for trace in cell['traces']]
+        
+        layout['annotations'].append({
+            'text': subplot_title, 'font': {'size': 16}, 'showarrow': False,
+            'x': sum(x_domain) / 2, 'xanchor': 'center', 'xref': 'paper',
+            'y': y_domain[1], 'yanchor': 'bottom', 'yref': 'paper',
+        })
     
-    fig, axes = plt.subplots(2, 2, figsize=(14, 12))
-    fig.suptitle('Seasonal Analysis Dashboard', fontsize=18, weight='bold')
-
-    # Seasonal revenue
-    season_order = ['Spring', 'Summer', 'Fall', 'Winter']
-    sns.barplot(data=seasonal, x='total_revenue', y='season', order=season_order, ax=axes[0, 0], palette='coolwarm')
-    axes[0, 0].set_title('Revenue by Season')
-    axes[0, 0].set_xlabel('Total Revenue ($)')
-    axes[0, 0].set_ylabel('Season')
-
-    # Weekly patterns
-    weekday_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-    sns.barplot(data=weekly, x='total_revenue', y='weekday_name', order=weekday_order, ax=axes[0, 1], palette='PRGn')
-    axes[0, 1].set_title('Revenue by Day of Week')
-    axes[0, 1].set_xlabel('Total Revenue ($)')
-    axes[0, 1].set_ylabel('')
-
-    # Monthly trends
-    sns.lineplot(data=monthly, x='year_month', y='total_revenue', marker='o', ax=axes[1, 0], color='purple')
-    axes[1, 0].set_title('Monthly Trends')
-    axes[1, 0].set_xlabel('Month')
-    axes[1, 0].set_ylabel('Total Revenue ($)')
-    axes[1, 0].tick_params(axis='x', rotation=45)
-
-    # Transaction volume
-    sns.barplot(data=seasonal, x='total_transactions', y='season', order=season_order, ax=axes[1, 1], palette='cividis')
-    axes[1, 1].set_title('Transaction Volume by Season')
-    axes[1, 1].set_xlabel('Total Transactions')
-    axes[1, 1].set_ylabel('')
-
-    plt.tight_layout(rect=[0, 0.03, 1, 0.95])
+    return figure_json(data, layout)
+
+def _render_profitability_chart():
+    """Build the profitability charts as Plotly figure JSON"""
+    mall_prof = derived_cache['mall_profitability_sorted']
+    category_prof = derived_cache['category_profitability_sorted']
+    malls = mall_prof['shopping_mall'].tolist()
+    region_revenue = derived_cache['region_revenue']
     
-    return JSONResponse(content={"image": fig_to_base64(fig)})
-
-@app.get("/api/charts/payment")
-async def get_payment_chart():
-    """Generate payment method analysis charts"""
-    if not data_cache:
-        raise HTTPException(status_code=503, detail="Data not loaded")
+    return grid_figure(
+        'Profitability Dashboard',
+        ('Net Revenue by Mall', 'Discount Rate by Mall', 'Revenue by Category', 'Regional Revenue Distribution'),
+        [
+            # Mall revenue
+            {'traces': [hbar(mall_prof['net_revenue'].to_numpy(), malls, 'Viridis')],
+             'xaxis': axis_title('Net Revenue ($)'), 'yaxis': axis_title('Shopping Mall', autorange='reversed')},
+            # Discount rates
+            {'traces': [hbar(mall_prof['discount_rate'].to_numpy(), malls, 'Plasma')],
+             'xaxis': axis_title('Average Discount Rate (%)'), 'yaxis': {'autorange': 'reversed'}},
+            # Category revenue
+            {'traces': [hbar(category_prof['final_amount'].to_numpy(), category_prof['category'].tolist(), 'Magma')],
+             'xaxis': axis_title('Total Revenue ($)'), 'yaxis': axis_title('Category', autorange='reversed')},
+            # Regional distribution
+            {'traces': [pie(region_revenue.index.tolist(), region_revenue.to_numpy())]},
+        ],
+        height=800, showlegend=False,
+    )
+
+def _render_seasonal_chart():
+    """Build the seasonal analysis charts as Plotly figure JSON"""
+    seasonal = derived_cache['seasonal_ordered']
+    weekly = derived_cache['weekly_ordered']
+    monthly = data_cache['monthly_trends']
     
+    return grid_figure(
+        'Seasonal Analysis Dashboard',
+        ('Revenue by Season', 'Revenue by Day of Week', 'Monthly Trends', 'Transaction Volume by Season'),
+        [
+            # Seasonal revenue
+            {'traces': [hbar(seasonal['total_revenue'].to_numpy(), SEASON_ORDER, 'RdBu_r')],
+             'xaxis': axis_title('Total Revenue ($)'), 'yaxis': axis_title('Season', autorange='reversed')},
+            # Weekly patterns
+            {'traces': [hbar(weekly['total_revenue'].to_numpy(), WEEKDAY_ORDER, 'PRGn')],
+             'xaxis': axis_title('Total Revenue ($)'), 'yaxis': {'autorange': 'reversed'}},
+            # Monthly trends
+            {'traces': [{'type': 'scatter', 'mode': 'lines+markers', 'x': monthly['year_month'].tolist(),
+                         'y': monthly['total_revenue'].to_numpy(), 'line': {'color': 'purple'}}],
+             'xaxis': axis_title('Month', tickangle=45), 'yaxis': axis_title('Total Revenue ($)')},
+            # Transaction volume
+            {'traces': [hbar(seasonal['total_transactions'].to_numpy(), SEASON_ORDER, 'Cividis')],
+             'xaxis': axis_title('Total Transactions'), 'yaxis': {'autorange': 'reversed'}},
+        ],
+        height=800, showlegend=False,
+    )
+
+def _render_payment_chart():
+    """Build the payment method analysis charts as Plotly figure JSON"""
     payment = data_cache['payment_analysis']
+    methods = payment['payment_method'].tolist()
     
-    fig, axes = plt.subplots(2, 2, figsize=(14, 12))
-    fig.suptitle('Payment Methods Analysis', fontsize=18, weight='bold')
-
-    # Revenue distribution
-    axes[0, 0].pie(payment['total_revenue'], labels=payment['payment_method'], autopct='%1.1f%%', startangle=90, colors=sns.color_palette('Set2'))
-    axes[0, 0].set_title('Revenue by Payment Method')
-
-    # Transaction count
-    axes[0, 1].pie(payment['transaction_count'], labels=payment['payment_method'], autopct='%1.1f%%', startangle=90, colors=sns.color_palette('Set3'))
-    axes[0, 1].set_title('Transaction Count by Payment Method')
-
-    # Average transaction value
-    sns.barplot(data=payment, x='avg_transaction_value', y='payment_method', ax=axes[1, 0], palette='rocket')
-    axes[1, 0].set_title('Average Transaction Value')
-    axes[1, 0].set_xlabel('Average Value ($)')
-    axes[1, 0].set_ylabel('Payment Method')
-
-    # Comparison
-    payment_melted = payment.melt(id_vars='payment_method', 
-                                  value_vars=['revenue_percentage', 'transaction_percentage'],
-                                  var_name='percentage_type', value_name='percentage')
-    sns.barplot(data=payment_melted, x='percentage', y='payment_method', hue='percentage_type', ax=axes[1, 1], palette='icefire')
-    axes[1, 1].set_title('Revenue vs. Transaction Percentage')
-    axes[1, 1].set_xlabel('Percentage (%)')
-    axes[1, 1].set_ylabel('')
-
-    plt.tight_layout(rect=[0, 0.03, 1, 0.95])
-    
-    return JSONResponse(content={"image": fig_to_base64(fig)})
-
-@app.get("/api/charts/regional")
-async def get_regional_chart():
-    """Generate regional analysis charts"""
-    if not data_cache:
-        raise HTTPException(status_code=503, detail="Data not loaded")
+    return grid_figure(
+        'Payment Methods Analysis',
+        ('Revenue by Payment Method', 'Transaction Count by Payment Method',
+         'Average Transaction Value', 'Revenue vs. Transaction Percentage'),
+        [
+            # Revenue distribution
+            {'traces': [pie(methods, payment['total_revenue'].to_numpy(), showlegend=False)]},
+            # Transaction count
+            {'traces': [pie(methods, payment['transaction_count'].to_numpy(), showlegend=False)]},
+            # Average transaction value
+            {'traces': [hbar(payment['avg_transaction_value'].to_numpy(), methods, 'OrRd', showlegend=False)],
+             'xaxis': axis_title('Average Value ($)'), 'yaxis': axis_title('Payment Method')},
+            # Comparison
+            {'traces': [hbar(payment['revenue_percentage'].to_numpy(), methods, name='revenue_percentage'),
+                        hbar(payment['transaction_percentage'].to_numpy(), methods, name='transaction_percentage')],
+             'xaxis': axis_title('Percentage (%)'), 'yaxis': {}},
+        ],
+        height=800, barmode='group',
+    )
+
+# Resolutions for the regional chart: query value -> (pandas offset alias, title label)
+REGIONAL_FREQUENCIES = {'D': (None, 'Daily'), 'W': ('W', 'Weekly'), 'M': ('ME', 'Monthly')}
+
+def resample_revenue(df, rule):
+    """Sum total_revenue into rule-sized periods; rule=None keeps the daily points"""
+    if rule is None:
+        return df
+    return df.resample(rule, on='invoice_date')['total_revenue'].sum().reset_index()
+
+def _render_regional_chart(freq):
+    """Build the regional analysis chart as Plotly figure JSON at the given resolution"""
+    rule, label = REGIONAL_FREQUENCIES[freq]
+    data = []
     
-    regional_daily = data_cache['regional_daily_sales']
+    for region, region_data in derived_cache['regional_by_region'].items():
+        region_data = resample_revenue(region_data, rule)
+        data.append({'type': 'scattergl', 'mode': 'lines', 'name': region,
+                     'x': region_data['invoice_date'].to_numpy(), 'y': region_data['total_revenue'].to_numpy()})
     
-    fig, ax = plt.subplots(figsize=(12, 7))
+    # Add overall trend
+    overall = resample_revenue(data_cache['overall_daily_sales'], rule)
+    data.append({'type': 'scattergl', 'mode': 'lines', 'name': 'Overall',
+                 'x': overall['invoice_date'].to_numpy(), 'y': overall['total_revenue'].to_numpy(),
+                 'line': {'color': 'black', 'dash': 'dash'}})
     
-    sns.lineplot(data=regional_daily, x='invoice_date', y='total_revenue', hue='Region', ax=ax, palette='tab10')
+    layout = {'template': PLOTLY_TEMPLATE, 'title': {'text': f'Regional {label} Sales Trends'},
+              'xaxis': axis_title('Date'), 'yaxis': axis_title('Revenue ($)'),
+              'legend': {'title': {'text': 'Region'}}, 'height': 600}
     
-    # Add overall trend
-    overall = regional_daily.groupby('invoice_date')['total_revenue'].sum().reset_index()
-    sns.lineplot(data=overall, x='invoice_date', y='total_revenue', ax=ax, color='black', linestyle='--', label='Overall')
+    return figure_json(data, layout)
+
+# Chart builders, run once per data load rather than once per request
+CHART_RENDERERS = {
+    'profitability': _render_profitability_chart,
+    'seasonal': _render_seasonal_chart,
+    'payment': _render_payment_chart,
+    **{f'regional_{freq}': partial(_render_regional_chart, freq) for freq in REGIONAL_FREQUENCIES},
+}
+
+def render_charts():
+    """Build every chart as figure JSON, compressing and hashing each one once"""
+    charts = {name: render() for name, render in CHART_RENDERERS.items()}
+    charts_gzip = {name: gzip.compress(body, compresslevel=9) for name, body in charts.items()}
+    etags = {name: make_etag(body) for name, body in charts.items()}
+    return charts, charts_gzip, etags
+
+def encoded_response(body, gzip_body, etag, request: Request):
+    """Serve a pre-built JSON body, or its precompressed copy when the client accepts gzip"""
+    headers = {"Cache-Control": API_CACHE_CONTROL, "ETag": etag, "Vary": "Accept-Encoding"}
+    # PrecompressedSkippingGZipMiddleware leaves these routes alone; the gzip body gets its own ETag
+    if "gzip" in request.headers.get("accept-encoding", ""):
+        headers["Content-Encoding"] = "gzip"
+        headers["ETag"] = f'{etag[:-1]}-gz"'
+        return Response(content=gzip_body, media_type="application/json", headers=headers)
     
-    ax.set_title('Regional Daily Sales Trends', fontsize=16)
-    ax.set_xlabel('Date')
-    ax.set_ylabel('Revenue ($)')
-    ax.legend(title='Region')
+    return Response(content=body, media_type="application/json", headers=headers)
+
+def chart_response(name, request: Request):
+    """Serve a pre-built chart from CHART_CACHE"""
+    if name not in CHART_CACHE:
+        raise HTTPException(status_code=503, detail="Data not loaded")
     
-    plt.tight_layout()
+    return encoded_response(CHART_CACHE[name], CHART_GZIP[name], CHART_ETAGS[name], request)
+
+def render_payloads():
+    """Serialize the summary and record tables once, compressing and hashing each body"""
+    payloads = {'summary': compute_summary()}
+    # Records come straight from the Arrow tables, skipping pandas' per-row boxing in to_dict()
+    payloads.update({name: arrow_cache[name].to_pylist() for name in RECORD_TABLES})
+    bodies = {name: orjson.dumps(payload, option=ORJSON_OPTIONS) for name, payload in payloads.items()}
+    bodies_gzip = {name: gzip.compress(body, compresslevel=9) for name, body in bodies.items()}
+    etags = {name: make_etag(body) for name, body in bodies.items()}
+    return bodies, bodies_gzip, etags
+
+def payload_response(name, request: Request):
+    """Serve a pre-serialized JSON body from PAYLOAD_CACHE"""
+    if name not in PAYLOAD_CACHE:
+        raise HTTPException(status_code=503, detail="Data not loaded")
     
-    return JSONResponse(content={"image": fig_to_base64(fig)})
+    return encoded_response(PAYLOAD_CACHE[name], PAYLOAD_GZIP[name], PAYLOAD_ETAGS[name], request)
+
+@app.get("/api/charts/profitability")
+async def get_profitability_chart(request: Request):
+    """Get profitability charts"""
+    return chart_response('profitability', request)
+
+@app.get("/api/charts/seasonal")
+async def get_seasonal_chart(request: Request):
+    """Get seasonal analysis charts"""
+    return chart_response('seasonal', request)
+
+@app.get("/api/charts/payment")
+async def get_payment_chart(request: Request):
+    """Get payment method analysis charts"""
+    return chart_response('payment', request)
+
+@app.get("/api/charts/regional")
+async def get_regional_chart(request: Request, freq: str = Query('W', pattern='^[DWM]$')):
+    """Get regional analysis charts, summed to daily (D), weekly (W) or monthly (M) points"""
+    return chart_response(f'regional_{freq}', request)
 
 @app.get("/api/data/mall_profitability")
-async def get_mall_profitability():
+async def get_mall_profitability(request: Request):
     """Get mall profitability data"""
-    if not data_cache:
-        raise HTTPException(status_code=503, detail="Data not loaded")
-    
-    return JSONResponse(content=data_cache['mall_profitability'].to_dict(orient='records'))
+    return payload_response('mall_profitability', request)
 
 @app.get("/api/data/category_profitability")
-async def get_category_profitability():
+async def get_category_profitability(request: Request):
     """Get category profitability data"""
-    if not data_cache:
-        raise HTTPException(status_code=503, detail="Data not loaded")
-    
-    return JSONResponse(content=data_cache['category_profitability'].to_dict(orient='records'))
+    return payload_response('category_profitability', request)
 
 @app.get("/api/data/payment_analysis")
-async def get_payment_analysis():
+async def get_payment_analysis(request: Request):
     """Get payment analysis data"""
-    if not data_cache:
-        raise HTTPException(status_code=503, detail="Data not loaded")
+    return payload_response('payment_analysis', request)
+
+@app.post("/api/reload")
+async def reload_data():
+    """Reload analysis results and rebuild the cached charts after a pipeline run"""
+    if _cache_lock.locked():
+        raise HTTPException(status_code=409, detail="Reload already in progress")
     
-    return JSONResponse(content=data_cache['payment_analysis'].to_dict(orient='records'))
+    if not await load_data():
+        raise HTTPException(status_code=500, detail="Failed to reload data")
+    
+    return {"status": "reloaded", "datasets": len(data_cache), "charts": len(CHART_CACHE)}
+
+# Mounted last so the API routes above take precedence; serves static/index.html at /
+app.mount("/", StaticFiles(directory=STATIC_PATH, html=True), name="static")
 
 if __name__ == "__main__":
     import uvicorn
     print("🚀 Starting MLOPS Analytics Dashboard...")
     print("📊 Dashboard will be available at: http://localhost:8000")
     print("📚 API documentation at: http://localhost:8000/docs")
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    # One worker process unless DASHBOARD_WORKERS asks for more; "auto" picks uvloop and httptools when installed
+    uvicorn.run("app:app", host="0.0.0.0", port=8000, workers=DASHBOARD_WORKERS,
+                loop="auto", http="auto", log_level="warning")
\ No newline at end of file
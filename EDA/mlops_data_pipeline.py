@@ -14,31 +14,80 @@ Date: 2025-09-25
 
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-from datetime import datetime, timedelta
-import warnings
+import pyarrow as pa
+import pyarrow.parquet as pq
 import logging
+import multiprocessing
 import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
 
-warnings.filterwarnings('ignore')
+# Low-cardinality label columns of the combined dataset, held as categoricals after preprocessing
+CATEGORICAL_COLUMNS = ['shopping_mall', 'Region', 'category', 'payment_method', 'season', 'gender']
+
+# Result file formats save_results can write
+OUTPUT_FORMATS = ('parquet', 'csv', 'both')
+
+# Integer widths for the raw input columns (checked against the data before casting)
+INPUT_DTYPES = {'age': 'int8', 'quantity': 'int32'}
+
+# Category labels in code order: seasons from month % 12 // 3, weekdays from dayofweek
+SEASONS = ['Winter', 'Spring', 'Summer', 'Fall']
+WEEKDAY_NAMES = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+# Set MLOPS_STRICT_VALIDATE to also scan the customer data for duplicate rows
+STRICT_VALIDATION = bool(os.environ.get('MLOPS_STRICT_VALIDATE'))
+
+# Rows per row group in the preprocessed-data cache, so column reads stream in cache-sized chunks
+CACHE_ROW_GROUP_SIZE = 262144
+
+# Schema metadata key holding the input files' modification times the cache was built from
+CACHE_STAMP_KEY = b'mlops_input_stamp'
+
+# Independent analysis stages and the result attributes each one sets
+ANALYSIS_STAGES = {
+    'process_daily_sales_data': ('daily_sales', 'regional_daily_sales', 'overall_daily_sales'),
+    'calculate_profitability': ('mall_profitability', 'category_profitability'),
+    'identify_seasonal_trends': ('monthly_trends', 'seasonal_trends', 'quarterly_trends', 'weekly_patterns'),
+    'analyze_payment_methods': ('payment_analysis', 'payment_by_region', 'payment_by_category', 'payment_trends')
+}
+
+def _env_worker_count(name, default):
+    """
+    Worker count from an environment variable: default when unset, empty or not a number, and at least 1
+    """
+    try:
+        return max(1, int(os.environ.get(name, '').strip()))
+    except ValueError:
+        return default
+
+# Worker processes running the analysis stages; 1 runs them one after another in this process
+ANALYSIS_WORKERS = _env_worker_count('MLOPS_ANALYSIS_WORKERS', min(len(ANALYSIS_STAGES), os.cpu_count() or 1))
+
+# Threads writing result files; the CSV/Parquet writers release the GIL
+SAVE_WORKERS = 8
 
 class MLOPSDataPipeline:
     """
     A comprehensive data pipeline for MLOPS shopping data analysis
     """
     
-    def __init__(self, data_path="D:/GenAI/MLOPS"):
+    def __init__(self, data_path="D:/GenAI/MLOPS", output_format="both"):
         """
         Initialize the pipeline with data path
         
         Args:
             data_path (str): Path to the directory containing CSV files
+            output_format (str): Result files to write: 'parquet', 'csv' or 'both'
         """
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError(f"output_format must be one of {OUTPUT_FORMATS}, got {output_format!r}")
+        
         self.data_path = Path(data_path)
+        self.output_format = output_format
         self.customer_file = self.data_path / "customer_shopping_data.csv"
         self.region_file = self.data_path / "Region_detail_table.csv"
+        self.combined_cache = self.data_path / "results" / ".pipeline_cache" / "combined_data.parquet"
         self.df_combined = None
         
         # Setup logging
@@ -64,15 +113,17 @@ class MLOPSDataPipeline:
         if not self.region_file.exists():
             raise FileNotFoundError(f"Region data file not found: {self.region_file}")
         
-        # Load datasets
-        self.df_customer = pd.read_csv(self.customer_file)
-        self.df_region = pd.read_csv(self.region_file)
+        # Load datasets with the multi-threaded Arrow CSV reader, parsing dates while reading
+        self.df_customer = pd.read_csv(self.customer_file, engine='pyarrow',
+                                       parse_dates=['invoice_date'], date_format='%d-%m-%Y')
+        self.df_region = pd.read_csv(self.region_file, engine='pyarrow')
         
         self.logger.info(f"Loaded customer data: {self.df_customer.shape}")
         self.logger.info(f"Loaded region data: {self.df_region.shape}")
         
         # Data validation
         self._validate_data()
+        self._downcast_inputs()
         
     def _validate_data(self):
         """
@@ -94,33 +145,53 @@ class MLOPSDataPipeline:
         if missing_region_cols:
             raise ValueError(f"Missing columns in region data: {missing_region_cols}")
         
-        # Check for duplicates
-        customer_duplicates = self.df_customer.duplicated().sum()
-        if customer_duplicates > 0:
-            self.logger.warning(f"Found {customer_duplicates} duplicate rows in customer data")
+        # Check for duplicates (hashes every row, and is only reported, so opt-in)
+        if STRICT_VALIDATION:
+            customer_duplicates = self.df_customer.duplicated().sum()
+            if customer_duplicates > 0:
+                self.logger.warning(f"Found {customer_duplicates} duplicate rows in customer data")
         
         # Check data types and ranges
-        if self.df_customer['age'].min() < 0 or self.df_customer['age'].max() > 120:
+        ages = self.df_customer['age'].to_numpy()
+        if ages.min() < 0 or ages.max() > 120:
             self.logger.warning("Age values seem unrealistic")
         
-        if self.df_customer['price'].min() < 0:
+        if self.df_customer['price'].to_numpy().min() < 0:
             self.logger.warning("Negative price values found")
         
         self.logger.info("Data validation completed")
         
+    def _downcast_inputs(self):
+        """
+        Narrow the raw integer columns to INPUT_DTYPES, refusing values that would wrap around
+        """
+        for column, dtype in INPUT_DTYPES.items():
+            limits = np.iinfo(dtype)
+            values = self.df_customer[column]
+            if values.min() < limits.min or values.max() > limits.max:
+                raise ValueError(f"Column {column} has values outside the {dtype} range")
+            self.df_customer[column] = values.astype(dtype)
+        
     def join_datasets(self):
         """
         Join customer shopping data with region details based on shopping_mall column
         """
         self.logger.info("Joining datasets on shopping_mall column...")
         
-        # Perform inner join to ensure we only get records with matching regions
-        self.df_combined = pd.merge(
-            self.df_customer, 
-            self.df_region, 
-            on='shopping_mall', 
-            how='inner'
+        regions = self.df_region.set_index('shopping_mall')
+        if regions.index.has_duplicates:
+            raise ValueError("Region data lists a shopping_mall more than once")
+        
+        # The region table has one row per mall, so look each distinct mall up instead of
+        # merging; rows whose mall has no region are dropped, as in an inner join
+        codes, malls = pd.factorize(self.df_customer['shopping_mall'])
+        positions = regions.index.get_indexer(malls)[codes]
+        self.df_combined = self.df_customer.assign(
+            **{column: regions[column].to_numpy()[positions] for column in regions.columns}
         )
+        matched = positions >= 0
+        if not matched.all():
+            self.df_combined = self.df_combined[matched].reset_index(drop=True)
         
         self.logger.info(f"Combined dataset shape: {self.df_combined.shape}")
         
@@ -137,51 +208,77 @@ class MLOPSDataPipeline:
         """
         self.logger.info("Preprocessing data...")
         
-        # Convert date column to datetime
-        self.df_combined['invoice_date'] = pd.to_datetime(
-            self.df_combined['invoice_date'], 
-            format='%d-%m-%Y'
+        df = self.df_combined
+        
+        # invoice_date is parsed at load time
+        dates = df['invoice_date'].dt
+        
+        # Convert discount percentage to numeric, parsing each distinct value ('24%', ...) once
+        discount_codes, discounts = pd.factorize(df['Discount'])
+        discount_numeric = (discounts.str.replace('%', '').astype(float).to_numpy() / 100)[discount_codes]
+        
+        # Amounts before discount, of the discount, and after discount, on the raw arrays
+        # (no index alignment); each is stored as a column, so each gets exactly one buffer
+        total_amount = df['quantity'].to_numpy() * df['price'].to_numpy()
+        discount_amount = total_amount * discount_numeric
+        
+        # Attach every derived column in one projection rather than one insert per column
+        self.df_combined = df.assign(
+            discount_numeric=discount_numeric,
+            total_amount=total_amount,
+            discount_amount=discount_amount,
+            final_amount=total_amount - discount_amount,
+            # Date components for analysis, at the narrowest width that holds them
+            year=dates.year.astype('int16'),
+            month=dates.month.astype('int8'),
+            day=dates.day.astype('int8'),
+            weekday=dates.dayofweek.astype('int8'),
+            quarter=dates.quarter.astype('int8'),
+            day_of_year=dates.dayofyear.astype('int16'),
+            # Season classification: Dec-Feb -> 0 (Winter), Mar-May -> 1 (Spring), ...
+            season=pd.Categorical.from_codes((dates.month.to_numpy() % 12 // 3).astype(np.int8),
+                                             categories=SEASONS),
+            # Integer stand-in for customer_id, so unique-customer counts hash ints instead of strings
+            customer_id_code=pd.factorize(df['customer_id'])[0].astype(np.int32)
         )
         
-        # Convert discount percentage to numeric
-        self.df_combined['discount_numeric'] = (
-            self.df_combined['Discount']
-            .str.replace('%', '')
-            .astype(float) / 100
-        )
+        # Hold the repeated labels as categoricals so every groupby hashes integer codes, not strings
+        for column in CATEGORICAL_COLUMNS:
+            self.df_combined[column] = self.df_combined[column].astype('category')
         
-        # Calculate total amount before discount
-        self.df_combined['total_amount'] = (
-            self.df_combined['quantity'] * self.df_combined['price']
-        )
-        
-        # Calculate discount amount
-        self.df_combined['discount_amount'] = (
-            self.df_combined['total_amount'] * self.df_combined['discount_numeric']
-        )
+        self.logger.info("Data preprocessing completed")
         
-        # Calculate final amount after discount
-        self.df_combined['final_amount'] = (
-            self.df_combined['total_amount'] - self.df_combined['discount_amount']
-        )
+    def _input_stamp(self):
+        """
+        Modification times of the input files, stored with the cache to tie it to this data
+        """
+        return f"{self.customer_file.stat().st_mtime_ns}:{self.region_file.stat().st_mtime_ns}".encode()
         
-        # Extract date components for analysis
-        self.df_combined['year'] = self.df_combined['invoice_date'].dt.year
-        self.df_combined['month'] = self.df_combined['invoice_date'].dt.month
-        self.df_combined['day'] = self.df_combined['invoice_date'].dt.day
-        self.df_combined['weekday'] = self.df_combined['invoice_date'].dt.dayofweek
-        self.df_combined['quarter'] = self.df_combined['invoice_date'].dt.quarter
-        self.df_combined['day_of_year'] = self.df_combined['invoice_date'].dt.dayofyear
-        
-        # Add season classification
-        self.df_combined['season'] = self.df_combined['month'].map({
-            12: 'Winter', 1: 'Winter', 2: 'Winter',
-            3: 'Spring', 4: 'Spring', 5: 'Spring',
-            6: 'Summer', 7: 'Summer', 8: 'Summer',
-            9: 'Fall', 10: 'Fall', 11: 'Fall'
-        })
+    def _cache_combined(self):
+        """
+        Persist the preprocessed dataset so worker processes can read just the columns they use
+        """
+        table = pa.Table.from_pandas(self.df_combined, preserve_index=False)
+        table = table.replace_schema_metadata({**table.schema.metadata, CACHE_STAMP_KEY: self._input_stamp()})
+        self.combined_cache.parent.mkdir(parents=True, exist_ok=True)
+        # Written aside and renamed, so a worker never reads a half-written cache
+        tmp_path = self.combined_cache.with_suffix(f".{os.getpid()}.tmp")
+        pq.write_table(table, tmp_path, row_group_size=CACHE_ROW_GROUP_SIZE, compression='zstd')
+        os.replace(tmp_path, self.combined_cache)
+        
+    def _analysis_frame(self, columns):
+        """
+        The given columns of the preprocessed dataset, from memory or else from the Parquet cache
+        """
+        if self.df_combined is not None:
+            return self.df_combined[columns]
         
-        self.logger.info("Data preprocessing completed")
+        # Refuse a cache left by a run over different input files
+        metadata = pq.read_schema(self.combined_cache).metadata or {}
+        if metadata.get(CACHE_STAMP_KEY) != self._input_stamp():
+            raise ValueError(f"Preprocessed data cache {self.combined_cache} does not match the input files; "
+                             "run preprocess_data first")
+        return pd.read_parquet(self.combined_cache, columns=columns)
         
     def process_daily_sales_data(self):
         """
@@ -189,17 +286,20 @@ class MLOPSDataPipeline:
         """
         self.logger.info("Processing daily sales data...")
         
-        # Daily sales aggregation
-        daily_sales = self.df_combined.groupby(['invoice_date', 'shopping_mall', 'Region']).agg({
-            'final_amount': ['sum', 'count', 'mean'],
-            'quantity': 'sum',
-            'customer_id': 'nunique'
-        }).round(2)
+        df = self._analysis_frame(['invoice_date', 'shopping_mall', 'Region', 'final_amount', 'quantity',
+                                   'customer_id_code'])
         
-        # Flatten column names
-        daily_sales.columns = ['total_revenue', 'transaction_count', 'avg_transaction_value', 
-                              'total_quantity', 'unique_customers']
-        daily_sales = daily_sales.reset_index()
+        # Daily sales aggregation
+        daily_sales = df.groupby(['invoice_date', 'shopping_mall', 'Region'], observed=True).agg(
+            total_revenue=('final_amount', 'sum'),
+            transaction_count=('final_amount', 'size'),
+            total_quantity=('quantity', 'sum'),
+            unique_customers=('customer_id_code', 'nunique')
+        )
+        # Means come from the sums and sizes already computed rather than another pass over the rows
+        daily_sales.insert(2, 'avg_transaction_value',
+                           daily_sales['total_revenue'] / daily_sales['transaction_count'])
+        daily_sales = daily_sales.round(2).reset_index()
         
         # Calculate additional metrics
         daily_sales['revenue_per_customer'] = (
@@ -210,19 +310,26 @@ class MLOPSDataPipeline:
         self.daily_sales = daily_sales
         
         # Regional daily sales
-        regional_daily_sales = self.df_combined.groupby(['invoice_date', 'Region']).agg({
-            'final_amount': ['sum', 'count', 'mean'],
-            'quantity': 'sum',
-            'customer_id': 'nunique',
-            'shopping_mall': 'nunique'
-        }).round(2)
-        
-        regional_daily_sales.columns = ['total_revenue', 'transaction_count', 'avg_transaction_value',
-                                       'total_quantity', 'unique_customers', 'active_malls']
-        regional_daily_sales = regional_daily_sales.reset_index()
+        regional_daily_sales = df.groupby(['invoice_date', 'Region'], observed=True).agg(
+            total_revenue=('final_amount', 'sum'),
+            transaction_count=('final_amount', 'size'),
+            total_quantity=('quantity', 'sum'),
+            unique_customers=('customer_id_code', 'nunique'),
+            active_malls=('shopping_mall', 'nunique')
+        )
+        regional_daily_sales.insert(2, 'avg_transaction_value',
+                                    regional_daily_sales['total_revenue'] / regional_daily_sales['transaction_count'])
+        regional_daily_sales = regional_daily_sales.round(2).reset_index()
         
         self.regional_daily_sales = regional_daily_sales
         
+        # Overall daily trend across all regions (used by the dashboard's regional chart);
+        # regional_daily_sales is already in date order, so the keys need no sort
+        overall_daily_sales = regional_daily_sales.groupby('invoice_date', sort=False, as_index=False)[
+            'total_revenue'].sum().round({'total_revenue': 2})
+        
+        self.overall_daily_sales = overall_daily_sales
+        
         self.logger.info("Daily sales processing completed")
         return daily_sales, regional_daily_sales
     
@@ -232,47 +339,43 @@ class MLOPSDataPipeline:
         """
         self.logger.info("Calculating profitability metrics...")
         
-        # Mall-level profitability
-        mall_profitability = self.df_combined.groupby(['shopping_mall', 'Region']).agg({
-            'total_amount': 'sum',
-            'discount_amount': 'sum',
-            'final_amount': 'sum',
-            'quantity': 'sum',
-            'invoice_no': 'count'
-        }).round(2)
-        
-        mall_profitability.columns = ['gross_revenue', 'total_discounts', 'net_revenue',
-                                     'total_quantity', 'total_transactions']
-        
-        # Calculate profitability metrics
-        mall_profitability['discount_rate'] = (
-            mall_profitability['total_discounts'] / mall_profitability['gross_revenue'] * 100
-        ).round(2)
+        df = self._analysis_frame(['shopping_mall', 'Region', 'category', 'total_amount', 'discount_amount',
+                                   'final_amount', 'quantity'])
         
-        mall_profitability['avg_transaction_value'] = (
-            mall_profitability['net_revenue'] / mall_profitability['total_transactions']
-        ).round(2)
-        
-        mall_profitability['revenue_per_unit'] = (
-            mall_profitability['net_revenue'] / mall_profitability['total_quantity']
-        ).round(2)
+        # Mall-level profitability
+        mall_profitability = df.groupby(['shopping_mall', 'Region'], observed=True).agg(
+            gross_revenue=('total_amount', 'sum'),
+            total_discounts=('discount_amount', 'sum'),
+            net_revenue=('final_amount', 'sum'),
+            total_quantity=('quantity', 'sum'),
+            total_transactions=('final_amount', 'size')
+        )
         
-        mall_profitability = mall_profitability.reset_index()
+        # Calculate profitability metrics in one NumPy pass over the unrounded sums
+        gross = mall_profitability['gross_revenue'].to_numpy()
+        net = mall_profitability['net_revenue'].to_numpy()
+        mall_profitability = mall_profitability.assign(
+            discount_rate=mall_profitability['total_discounts'].to_numpy() / gross * 100,
+            avg_transaction_value=net / mall_profitability['total_transactions'].to_numpy(),
+            revenue_per_unit=net / mall_profitability['total_quantity'].to_numpy()
+        ).round(2).reset_index()
         
         # Category-level profitability
-        category_profitability = self.df_combined.groupby('category').agg({
-            'total_amount': 'sum',
-            'discount_amount': 'sum',
-            'final_amount': 'sum',
-            'quantity': 'sum'
-        }).round(2)
-        
-        category_profitability['profit_margin'] = (
-            (category_profitability['final_amount'] - category_profitability['discount_amount']) /
-            category_profitability['final_amount'] * 100
-        ).round(2)
+        category_profitability = df.groupby('category', observed=True).agg(
+            total_amount=('total_amount', 'sum'),
+            discount_amount=('discount_amount', 'sum'),
+            final_amount=('final_amount', 'sum'),
+            quantity=('quantity', 'sum')
+        )
+        
+        # Share of gross revenue kept after discounts, from the unrounded sums
+        gross = category_profitability['total_amount'].to_numpy()
+        net = category_profitability['final_amount'].to_numpy()
+        category_profitability['profit_margin'] = np.where(
+            gross > 0, net / np.where(gross > 0, gross, 1) * 100, 0.0
+        )
         
-        category_profitability = category_profitability.reset_index()
+        category_profitability = category_profitability.round(2).reset_index()
         
         self.mall_profitability = mall_profitability
         self.category_profitability = category_profitability
@@ -286,50 +389,45 @@ class MLOPSDataPipeline:
         """
         self.logger.info("Identifying seasonal trends...")
         
+        df = self._analysis_frame(['year', 'month', 'weekday', 'final_amount', 'quantity'])
+        
+        # Monthly totals are the only full-table pass; seasons and quarters roll up from them
+        monthly = df.groupby(['year', 'month']).agg(
+            total_revenue=('final_amount', 'sum'),
+            total_quantity=('quantity', 'sum'),
+            total_transactions=('final_amount', 'size')
+        ).reset_index()
+        totals = ['total_revenue', 'total_quantity', 'total_transactions']
+        
         # Monthly trends
-        monthly_trends = self.df_combined.groupby(['year', 'month']).agg({
-            'final_amount': 'sum',
-            'quantity': 'sum',
-            'invoice_no': 'count'
-        }).round(2)
-        
-        monthly_trends.columns = ['total_revenue', 'total_quantity', 'total_transactions']
-        monthly_trends = monthly_trends.reset_index()
+        monthly_trends = monthly.round(2)
         monthly_trends['year_month'] = monthly_trends['year'].astype(str) + '-' + monthly_trends['month'].astype(str).str.zfill(2)
         
         # Seasonal trends
-        seasonal_trends = self.df_combined.groupby('season').agg({
-            'final_amount': ['sum', 'mean'],
-            'quantity': 'sum',
-            'invoice_no': 'count'
-        }).round(2)
-        
-        seasonal_trends.columns = ['total_revenue', 'avg_revenue', 'total_quantity', 'total_transactions']
-        seasonal_trends = seasonal_trends.reset_index()
-        
-        # Quarterly trends
-        quarterly_trends = self.df_combined.groupby(['year', 'quarter']).agg({
-            'final_amount': 'sum',
-            'quantity': 'sum',
-            'invoice_no': 'count'
-        }).round(2)
-        
-        quarterly_trends.columns = ['total_revenue', 'total_quantity', 'total_transactions']
-        quarterly_trends = quarterly_trends.reset_index()
+        seasons = pd.Categorical.from_codes((monthly['month'].to_numpy() % 12 // 3).astype(np.int8),
+                                            categories=SEASONS)
+        seasonal_trends = monthly.groupby(seasons, observed=True)[totals].sum()
+        seasonal_trends.insert(1, 'avg_revenue',
+                               seasonal_trends['total_revenue'] / seasonal_trends['total_transactions'])
+        seasonal_trends = seasonal_trends.round(2).rename_axis('season').reset_index()
+        
+        # Quarterly trends (monthly is in (year, month) order, so quarters already arrive sorted)
+        quarters = ((monthly['month'] - 1) // 3 + 1).rename('quarter')
+        quarterly_trends = monthly.groupby([monthly['year'], quarters], sort=False, as_index=False)[
+            totals].sum().round(2)
         
         # Weekly patterns
-        weekly_patterns = self.df_combined.groupby('weekday').agg({
-            'final_amount': ['sum', 'mean'],
-            'invoice_no': 'count'
-        }).round(2)
-        
-        weekly_patterns.columns = ['total_revenue', 'avg_revenue', 'total_transactions']
-        weekly_patterns = weekly_patterns.reset_index()
+        weekly_patterns = df.groupby('weekday').agg(
+            total_revenue=('final_amount', 'sum'),
+            total_transactions=('final_amount', 'size')
+        )
+        weekly_patterns.insert(1, 'avg_revenue',
+                               weekly_patterns['total_revenue'] / weekly_patterns['total_transactions'])
+        weekly_patterns = weekly_patterns.round(2).reset_index()
         
-        # Map weekday numbers to names
-        weekday_names = {0: 'Monday', 1: 'Tuesday', 2: 'Wednesday', 3: 'Thursday',
-                        4: 'Friday', 5: 'Saturday', 6: 'Sunday'}
-        weekly_patterns['weekday_name'] = weekly_patterns['weekday'].map(weekday_names)
+        # Map weekday numbers (Monday=0) to names
+        weekly_patterns['weekday_name'] = pd.Categorical.from_codes(weekly_patterns['weekday'].to_numpy(),
+                                                                    categories=WEEKDAY_NAMES)
         
         self.monthly_trends = monthly_trends
         self.seasonal_trends = seasonal_trends
@@ -345,16 +443,19 @@ class MLOPSDataPipeline:
         """
         self.logger.info("Analyzing payment methods...")
         
-        # Overall payment method analysis
-        payment_analysis = self.df_combined.groupby('payment_method').agg({
-            'final_amount': ['sum', 'mean', 'count'],
-            'quantity': 'sum',
-            'customer_id': 'nunique'
-        }).round(2)
+        df = self._analysis_frame(['payment_method', 'Region', 'category', 'year', 'month', 'final_amount', 'quantity',
+                                   'customer_id_code'])
         
-        payment_analysis.columns = ['total_revenue', 'avg_transaction_value', 'transaction_count',
-                                   'total_quantity', 'unique_customers']
-        payment_analysis = payment_analysis.reset_index()
+        # Overall payment method analysis
+        payment_analysis = df.groupby('payment_method', observed=True).agg(
+            total_revenue=('final_amount', 'sum'),
+            transaction_count=('final_amount', 'size'),
+            total_quantity=('quantity', 'sum'),
+            unique_customers=('customer_id_code', 'nunique')
+        )
+        payment_analysis.insert(1, 'avg_transaction_value',
+                                payment_analysis['total_revenue'] / payment_analysis['transaction_count'])
+        payment_analysis = payment_analysis.round(2).reset_index()
         
         # Calculate percentages
         total_revenue = payment_analysis['total_revenue'].sum()
@@ -368,32 +469,25 @@ class MLOPSDataPipeline:
             payment_analysis['transaction_count'] / total_transactions * 100
         ).round(2)
         
-        # Payment method by region
-        payment_by_region = self.df_combined.groupby(['Region', 'payment_method']).agg({
-            'final_amount': 'sum',
-            'invoice_no': 'count'
-        }).round(2)
+        # One pass over the rows for every payment breakdown below; each is a (sorted) roll-up
+        # of this small cube, summed before rounding, so the cube itself is left unsorted
+        payment_cube = df.groupby(['Region', 'category', 'year', 'month', 'payment_method'],
+                                  sort=False, observed=True).agg(
+            total_revenue=('final_amount', 'sum'),
+            transaction_count=('final_amount', 'size')
+        ).reset_index()
         
-        payment_by_region.columns = ['total_revenue', 'transaction_count']
-        payment_by_region = payment_by_region.reset_index()
+        # Payment method by region
+        payment_by_region = payment_cube.groupby(['Region', 'payment_method'], observed=True, as_index=False)[
+            ['total_revenue', 'transaction_count']].sum().round(2)
         
         # Payment method by category
-        payment_by_category = self.df_combined.groupby(['category', 'payment_method']).agg({
-            'final_amount': 'sum',
-            'invoice_no': 'count'
-        }).round(2)
-        
-        payment_by_category.columns = ['total_revenue', 'transaction_count']
-        payment_by_category = payment_by_category.reset_index()
+        payment_by_category = payment_cube.groupby(['category', 'payment_method'], observed=True, as_index=False)[
+            ['total_revenue', 'transaction_count']].sum().round(2)
         
         # Payment method trends over time
-        payment_trends = self.df_combined.groupby(['year', 'month', 'payment_method']).agg({
-            'final_amount': 'sum',
-            'invoice_no': 'count'
-        }).round(2)
-        
-        payment_trends.columns = ['total_revenue', 'transaction_count']
-        payment_trends = payment_trends.reset_index()
+        payment_trends = payment_cube.groupby(['year', 'month', 'payment_method'], observed=True, as_index=False)[
+            ['total_revenue', 'transaction_count']].sum().round(2)
         
         self.payment_analysis = payment_analysis
         self.payment_by_region = payment_by_region
@@ -409,26 +503,30 @@ class MLOPSDataPipeline:
         """
         self.logger.info("Generating summary report...")
         
+        # Region revenue totals by category code, for the top region
+        regions = self.mall_profitability['Region'].array
+        mall_revenue = self.mall_profitability['net_revenue'].to_numpy()
+        
         report = {
             'data_overview': {
                 'total_records': len(self.df_combined),
                 'date_range': f"{self.df_combined['invoice_date'].min().date()} to {self.df_combined['invoice_date'].max().date()}",
                 'total_revenue': self.df_combined['final_amount'].sum(),
                 'total_transactions': len(self.df_combined),
-                'unique_customers': self.df_combined['customer_id'].nunique(),
+                'unique_customers': self.df_combined['customer_id_code'].nunique(),
                 'unique_malls': self.df_combined['shopping_mall'].nunique(),
                 'unique_regions': self.df_combined['Region'].nunique()
             },
             'top_performers': {
-                'top_mall_by_revenue': self.mall_profitability.loc[self.mall_profitability['net_revenue'].idxmax(), 'shopping_mall'],
-                'top_region_by_revenue': self.mall_profitability.groupby('Region')['net_revenue'].sum().idxmax(),
-                'top_category_by_revenue': self.category_profitability.loc[self.category_profitability['final_amount'].idxmax(), 'category'],
-                'most_popular_payment_method': self.payment_analysis.loc[self.payment_analysis['transaction_count'].idxmax(), 'payment_method']
+                'top_mall_by_revenue': self._top_label(self.mall_profitability, 'shopping_mall', 'net_revenue'),
+                'top_region_by_revenue': regions.categories[np.bincount(regions.codes, weights=mall_revenue).argmax()],
+                'top_category_by_revenue': self._top_label(self.category_profitability, 'category', 'final_amount'),
+                'most_popular_payment_method': self._top_label(self.payment_analysis, 'payment_method', 'transaction_count')
             },
             'seasonal_insights': {
-                'best_season': self.seasonal_trends.loc[self.seasonal_trends['total_revenue'].idxmax(), 'season'],
-                'best_weekday': self.weekly_patterns.loc[self.weekly_patterns['total_revenue'].idxmax(), 'weekday_name'],
-                'peak_month': self.monthly_trends.loc[self.monthly_trends['total_revenue'].idxmax(), 'year_month']
+                'best_season': self._top_label(self.seasonal_trends, 'season', 'total_revenue'),
+                'best_weekday': self._top_label(self.weekly_patterns, 'weekday_name', 'total_revenue'),
+                'peak_month': self._top_label(self.monthly_trends, 'year_month', 'total_revenue')
             }
         }
         
@@ -436,9 +534,27 @@ class MLOPSDataPipeline:
         self.logger.info("Summary report generated")
         return report
     
+    def _top_label(self, frame, label_column, value_column):
+        """
+        Label of the first row holding the largest value_column
+        """
+        return frame[label_column].to_numpy()[frame[value_column].to_numpy().argmax()]
+    
+    def _save_result(self, filepath, dataframe):
+        """
+        Write one result table in the configured output format(s)
+        """
+        if self.output_format in ('csv', 'both'):
+            dataframe.to_csv(filepath, index=False)
+        if self.output_format in ('parquet', 'both'):
+            # Parquet keeps native dtypes and is what the dashboard loads
+            dataframe.to_parquet(filepath.with_suffix('.parquet'), engine='pyarrow',
+                                 compression='zstd', index=False)
+        self.logger.info(f"Saved {filepath.stem} ({self.output_format})")
+        
     def save_results(self, output_dir=None):
         """
-        Save all analysis results to CSV files
+        Save all analysis results as CSV and/or Parquet files, per output_format
         """
         if output_dir is None:
             output_dir = self.data_path / "results"
@@ -451,9 +567,11 @@ class MLOPSDataPipeline:
         
         # Save all analysis results
         results_to_save = {
-            'combined_data.csv': self.df_combined,
+            # customer_id_code is an internal key; customer_id itself is kept
+            'combined_data.csv': self.df_combined.drop(columns='customer_id_code'),
             'daily_sales.csv': self.daily_sales,
             'regional_daily_sales.csv': self.regional_daily_sales,
+            'overall_daily_sales.csv': self.overall_daily_sales,
             'mall_profitability.csv': self.mall_profitability,
             'category_profitability.csv': self.category_profitability,
             'monthly_trends.csv': self.monthly_trends,
@@ -466,10 +584,10 @@ class MLOPSDataPipeline:
             'payment_trends.csv': self.payment_trends
         }
         
-        for filename, dataframe in results_to_save.items():
-            filepath = output_dir / filename
-            dataframe.to_csv(filepath, index=False)
-            self.logger.info(f"Saved {filename}")
+        with ThreadPoolExecutor(max_workers=SAVE_WORKERS) as executor:
+            # list() re-raises the first write error, if any
+            list(executor.map(self._save_result, (output_dir / name for name in results_to_save),
+                              results_to_save.values()))
         
         # Save summary report as text
         with open(output_dir / 'summary_report.txt', 'w') as f:
@@ -483,6 +601,29 @@ class MLOPSDataPipeline:
         
         self.logger.info("All results saved successfully")
     
+    def run_analyses(self):
+        """
+        Run the independent analysis stages, in parallel worker processes when ANALYSIS_WORKERS > 1
+        """
+        if ANALYSIS_WORKERS <= 1:
+            for stage in ANALYSIS_STAGES:
+                getattr(self, stage)()
+            return
+        
+        self.logger.info(f"Running {len(ANALYSIS_STAGES)} analysis stages on {ANALYSIS_WORKERS} worker processes...")
+        
+        # Only the workers need the Parquet cache; they read it rather than receiving this frame
+        self._cache_combined()
+        
+        # spawn behaves the same on Windows and POSIX
+        with ProcessPoolExecutor(max_workers=ANALYSIS_WORKERS,
+                                 mp_context=multiprocessing.get_context('spawn')) as executor:
+            futures = [executor.submit(_run_analysis_stage, self.data_path, self.combined_cache, stage)
+                       for stage in ANALYSIS_STAGES]
+            for future in futures:
+                for name, result in future.result().items():
+                    setattr(self, name, result)
+        
     def run_complete_pipeline(self):
         """
         Run the complete data pipeline
@@ -499,17 +640,8 @@ class MLOPSDataPipeline:
             # Step 3: Preprocess data
             self.preprocess_data()
             
-            # Step 4: Process daily sales data
-            self.process_daily_sales_data()
-            
-            # Step 5: Calculate profitability
-            self.calculate_profitability()
-            
-            # Step 6: Identify seasonal trends
-            self.identify_seasonal_trends()
-            
-            # Step 7: Analyze payment methods
-            self.analyze_payment_methods()
+            # Steps 4-7: Daily sales, profitability, seasonal trends and payment methods
+            self.run_analyses()
             
             # Step 8: Generate summary report
             self.generate_summary_report()
@@ -526,6 +658,16 @@ class MLOPSDataPipeline:
             raise
 
 
+def _run_analysis_stage(data_path, combined_cache, stage):
+    """
+    Run one analysis stage in a worker process on the given cache and return the results it set
+    """
+    pipeline = MLOPSDataPipeline(data_path)
+    pipeline.combined_cache = combined_cache
+    getattr(pipeline, stage)()
+    return {name: getattr(pipeline, name) for name in ANALYSIS_STAGES[stage]}
+
+
 def main():
     """
     Main function to run the pipeline
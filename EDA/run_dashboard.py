@@ -19,6 +19,7 @@ def check_results_exist():
     required_files = [
         'daily_sales.csv',
         'regional_daily_sales.csv',
+        'overall_daily_sales.csv',
         'mall_profitability.csv',
         'category_profitability.csv',
         'seasonal_trends.csv',
@@ -30,8 +31,9 @@ def check_results_exist():
     if not results_path.exists():
         return False
     
+    # Either format will do: the dashboard prefers Parquet and migrates a CSV on first load
     for file in required_files:
-        if not (results_path / file).exists():
+        if not (results_path / file).exists() and not (results_path / file).with_suffix('.parquet').exists():
             return False
     
     return True
@@ -61,9 +63,11 @@ def start_dashboard():
     print("\nPress CTRL+C to stop the server\n")
     
     import uvicorn
-    from app import app
+    from app import DASHBOARD_WORKERS
     
-    uvicorn.run(app, host="0.0.0.0", port=8000, log_level="info")
+    # Workers need the app as an import string so each process can load it
+    uvicorn.run("app:app", host="0.0.0.0", port=8000, workers=DASHBOARD_WORKERS,
+                loop="auto", http="auto", log_level="info")
 
 def main():
     """Main function"""
@@ -0,0 +1,82 @@
+// Load summary statistics
+async function loadSummaryStats() {
+    try {
+        const response = await fetch('/api/summary');
+        const data = await response.json();
+
+        const statsHtml = `
+            <div class="stat-card">
+                <div class="stat-value">${data.total_malls}</div>
+                <div class="stat-label">Shopping Malls</div>
+            </div>
+            <div class="stat-card">
+                <div class="stat-value">${data.total_regions}</div>
+                <div class="stat-label">Regions</div>
+            </div>
+            <div class="stat-card">
+                <div class="stat-value">$${(data.total_revenue / 1000000).toFixed(2)}M</div>
+                <div class="stat-label">Total Revenue</div>
+            </div>
+            <div class="stat-card">
+                <div class="stat-value">${data.total_transactions.toLocaleString()}</div>
+                <div class="stat-label">Transactions</div>
+            </div>
+        `;
+
+        document.getElementById('summaryStats').innerHTML = statsHtml;
+    } catch (error) {
+        console.error('Error loading summary:', error);
+        document.getElementById('summaryStats').innerHTML = 'Failed to load stats.';
+    }
+}
+
+// Generic function to load any chart (endpoints return Plotly figure JSON)
+async function loadChart(endpoint, elementId) {
+    const chartContainer = document.getElementById(elementId);
+    chartContainer.innerHTML = '<div class="loading">Loading chart...</div>';
+    try {
+        const response = await fetch(endpoint);
+        const figure = await response.json();
+        chartContainer.innerHTML = '';
+        Plotly.newPlot(chartContainer, figure.data, figure.layout, {responsive: true});
+    } catch (error) {
+        console.error(`Error loading chart for ${elementId}:`, error);
+        chartContainer.innerHTML = 'Failed to load chart.';
+    }
+}
+
+// Chart endpoints keyed by the element they render into
+const charts = {
+    profitabilityChart: '/api/charts/profitability',
+    seasonalChart: '/api/charts/seasonal',
+    paymentChart: '/api/charts/payment',
+    regionalChart: '/api/charts/regional'
+};
+
+// Refresh all data, fetching everything in parallel
+async function refreshData() {
+    await Promise.all([
+        loadSummaryStats(),
+        ...Object.entries(charts).map(([elementId, endpoint]) => loadChart(endpoint, elementId))
+    ]);
+}
+
+// Initial load: stats straight away, each chart once it scrolls into view
+function initialLoad() {
+    loadSummaryStats();
+    if (!('IntersectionObserver' in window)) {
+        Object.entries(charts).forEach(([elementId, endpoint]) => loadChart(endpoint, elementId));
+        return;
+    }
+    const observer = new IntersectionObserver((entries) => {
+        entries.forEach((entry) => {
+            if (entry.isIntersecting) {
+                observer.unobserve(entry.target);
+                loadChart(charts[entry.target.id], entry.target.id);
+            }
+        });
+    }, {rootMargin: '200px'});
+    Object.keys(charts).forEach((elementId) => observer.observe(document.getElementById(elementId)));
+}
+
+window.onload = initialLoad;
@@ -1,10 +1,16 @@
 import pandas as pd
+import pyarrow as pa
+from pyarrow import csv as pacsv
+import pyarrow.parquet as pq
 from fastapi import FastAPI, Response
 from fastapi.responses import HTMLResponse
 import matplotlib
-import seaborn as sns
 import matplotlib.pyplot as plt
 import io
+import os
+import threading
+from functools import lru_cache
+from pathlib import Path
 import uvicorn
 
 # Set the Matplotlib backend
@@ -12,23 +18,79 @@ matplotlib.use('Agg')
 
 app = FastAPI()
 
-# Load original data to populate filters and for plotting
+# --- CHANGE: One long-lived figure reused by every request instead of a new canvas each time ---
+# Sync routes run on a threadpool and Matplotlib state is not thread-safe, so drawing is serialized
+plot_fig, plot_ax = plt.subplots(figsize=(15, 7), layout='constrained')
+plot_lock = threading.Lock()
+
+# Both frames are indexed by these columns for fast per-group lookups
+GROUP_KEYS = ['shopping_mall', 'Region', 'category']
+
+# Daily sales per group, shared with forecast.py
+DAILY_SALES_FILE = Path('daily_by_mrc.parquet')
+
+def load_table(name, date_column, date_format):
+    """Load a dataset from Parquet, converting the CSV once if the Parquet copy is missing or stale."""
+    parquet_path = Path(f"{name}.parquet")
+    csv_path = Path(f"{name}.csv")
+    if parquet_path.exists() and (not csv_path.exists() or parquet_path.stat().st_mtime >= csv_path.stat().st_mtime):
+        return pd.read_parquet(parquet_path, engine='pyarrow')
+
+    # --- CHANGE: Multi-threaded Arrow CSV parser, with the date parsed straight into a timestamp column ---
+    if not csv_path.exists():
+        raise FileNotFoundError(csv_path)
+    convert_options = pacsv.ConvertOptions(column_types={date_column: pa.timestamp('ns')},
+                                           timestamp_parsers=[date_format])
+    table = pacsv.read_csv(csv_path, convert_options=convert_options)
+    # The Parquet file's existence marks the cache as built, so write it elsewhere and rename it into place
+    tmp_path = parquet_path.with_suffix(f".{os.getpid()}.tmp")
+    pq.write_table(table, tmp_path, compression='snappy')
+    os.replace(tmp_path, parquet_path)
+    return table.to_pandas()
+
+def select_group(df, shopping_mall, region, category):
+    """Return the rows of a group-indexed frame for one (mall, region, category), or no rows."""
+    try:
+        return df.loc[(shopping_mall, region, category)]
+    except KeyError:
+        return df.iloc[0:0]
+
+def build_daily_sales():
+    """Aggregate raw transactions into daily sales per (mall, region, category) and persist the result."""
+    shopping_data = load_table('customer_shopping_data', 'invoice_date', '%d-%m-%Y')
+    region_data = pacsv.read_csv('Region_detail_table.csv').to_pandas()
+    df = pd.merge(shopping_data, region_data, on='shopping_mall')
+    df['sales'] = df['price'] * df['quantity']
+    daily_sales = df.groupby(GROUP_KEYS + ['invoice_date'])['sales'].sum().reset_index()
+    # forecast.py writes the same file, so replace it whole rather than writing over it
+    tmp_path = DAILY_SALES_FILE.with_suffix(f".{os.getpid()}.tmp")
+    daily_sales.to_parquet(tmp_path, engine='pyarrow', compression='snappy', index=False)
+    os.replace(tmp_path, DAILY_SALES_FILE)
+    return daily_sales
+
+def load_daily_sales():
+    """Load the group-indexed daily sales history, building it from the raw data if the shared file is missing or stale."""
+    # --- CHANGE: Read the daily aggregate written by forecast.py; build it from the raw data only once ---
+    # Stale if either CSV build_daily_sales reads has changed since the aggregate was written
+    sources = [Path('customer_shopping_data.csv'), Path('Region_detail_table.csv')]
+    source_mtime = max((source.stat().st_mtime for source in sources if source.exists()), default=None)
+    if DAILY_SALES_FILE.exists() and (source_mtime is None or DAILY_SALES_FILE.stat().st_mtime >= source_mtime):
+        daily_sales = pd.read_parquet(DAILY_SALES_FILE, engine='pyarrow')
+    else:
+        daily_sales = build_daily_sales()
+    # --- CHANGE: Index by group so each request slices instead of scanning every row ---
+    return daily_sales.set_index(GROUP_KEYS).sort_index()
+
+# Load daily sales history to populate filters and for plotting
 try:
-    shopping_data = pd.read_csv('customer_shopping_data.csv')
-    # --- CHANGE: Convert date column on load ---
-    shopping_data['invoice_date'] = pd.to_datetime(shopping_data['invoice_date'], dayfirst=True)
-    region_data = pd.read_csv('Region_detail_table.csv')
-    original_df = pd.merge(shopping_data, region_data, on='shopping_mall')
-    # --- CHANGE: Calculate sales column on load ---
-    original_df['sales'] = original_df['price'] * original_df['quantity']
+    daily_sales_df = load_daily_sales()
 except FileNotFoundError:
-    original_df = pd.DataFrame()
+    daily_sales_df = pd.DataFrame()
     print("Warning: Original data files not found. Filter dropdowns may be empty.")
 
 # Load the forecasted data
 try:
-    forecast_df = pd.read_csv('sales_forecast.csv')
-    forecast_df['forecast_date'] = pd.to_datetime(forecast_df['forecast_date'])
+    forecast_df = load_table('sales_forecast', 'forecast_date', '%Y-%m-%d').set_index(GROUP_KEYS).sort_index()
 except FileNotFoundError:
     forecast_df = pd.DataFrame()
 
@@ -42,13 +104,13 @@ async def read_dashboard():
 
 @app.get("/filters")
 def get_filters():
-    if original_df.empty:
+    if daily_sales_df.empty:
         return {"error": "Original data not found, cannot populate filters."}
     
     filters = {
-        "shopping_malls": sorted(original_df['shopping_mall'].unique().tolist()),
-        "regions": sorted(original_df['Region'].unique().tolist()),
-        "categories": sorted(original_df['category'].unique().tolist())
+        "shopping_malls": sorted(daily_sales_df.index.unique(level='shopping_mall').tolist()),
+        "regions": sorted(daily_sales_df.index.unique(level='Region').tolist()),
+        "categories": sorted(daily_sales_df.index.unique(level='category').tolist())
     }
     return filters
 
@@ -56,32 +118,17 @@ def get_filters():
 def read_root():
     return {"message": "Sales Forecasting API. Go to /dashboard to see the UI."}
 
-@app.get("/forecast/plot")
-def get_forecast_plot(shopping_mall: str, region: str, category: str):
-    if forecast_df.empty or original_df.empty:
-        return Response(content="Data not found. Please run the forecasting script first.", status_code=404)
-
-    # --- NEW LOGIC TO GET BOTH ACTUAL AND FORECAST DATA ---
-
+@lru_cache(maxsize=512)
+def _render_forecast_png(shopping_mall, region, category):
+    """Render the actual-vs-forecast plot for one group as PNG bytes, or None if the group has no data."""
     # 1. Get forecast data
-    forecast_data = forecast_df[
-        (forecast_df['shopping_mall'] == shopping_mall) &
-        (forecast_df['Region'] == region) &
-        (forecast_df['category'] == category)
-    ]
+    forecast_data = select_group(forecast_df, shopping_mall, region, category)
 
-    # 2. Get and prepare actual data
-    actual_data_filtered = original_df[
-        (original_df['shopping_mall'] == shopping_mall) &
-        (original_df['Region'] == region) &
-        (original_df['category'] == category)
-    ]
-    
-    # Aggregate actual data to get daily sales totals
-    actual_daily_sales = actual_data_filtered.groupby('invoice_date')['sales'].sum().reset_index()
+    # 2. Get actual data (already aggregated to daily sales totals)
+    actual_daily_sales = select_group(daily_sales_df, shopping_mall, region, category)
 
     if forecast_data.empty or actual_daily_sales.empty:
-        return Response(content="No data available for the selected criteria.", status_code=404)
+        return None
 
     # 3. Determine the date range for the last year of actual data
     last_actual_date = actual_daily_sales['invoice_date'].max()
@@ -91,29 +138,55 @@ def get_forecast_plot(shopping_mall: str, region: str, category: str):
         actual_daily_sales['invoice_date'] >= one_year_prior
     ]
 
-    # 4. Create the combined plot
-    plt.figure(figsize=(15, 7))
+    # 4. Draw the combined plot on the shared figure
+    buf = io.BytesIO()
+    with plot_lock:
+        plot_ax.cla()
 
-    # Plot last 1 year of actual data
-    sns.lineplot(data=actual_data_last_year, x='invoice_date', y='sales', label='Actual Sales (Last 1 Year)')
+        # Plot last 1 year of actual data
+        plot_ax.plot(actual_data_last_year['invoice_date'].to_numpy(), actual_data_last_year['sales'].to_numpy(), label='Actual Sales (Last 1 Year)')
 
-    # Plot next 90 days of forecast data
-    sns.lineplot(data=forecast_data, x='forecast_date', y='forecasted_sales', label='Forecasted Sales (Next 90 Days)', linestyle='--')
+        # Plot next 90 days of forecast data
+        plot_ax.plot(forecast_data['forecast_date'].to_numpy(), forecast_data['forecasted_sales'].to_numpy(), label='Forecasted Sales (Next 90 Days)', linestyle='--')
 
-    plt.title(f'Sales History & Forecast for {category} in {shopping_mall} ({region})')
-    plt.xlabel('Date')
-    plt.ylabel('Sales')
-    plt.legend()
-    plt.grid(True, linestyle='--', alpha=0.6)
-    plt.tight_layout()
+        plot_ax.set_title(f'Sales History & Forecast for {category} in {shopping_mall} ({region})')
+        plot_ax.set_xlabel('Date')
+        plot_ax.set_ylabel('Sales')
+        plot_ax.legend()
+        plot_ax.grid(True, linestyle='--', alpha=0.6)
 
-    # Save plot to buffer
-    buf = io.BytesIO()
-    plt.savefig(buf, format='png')
-    buf.seek(0)
-    plt.close()
+        # Save plot to buffer
+        plot_fig.savefig(buf, format='png', pil_kwargs={'compress_level': 1})
 
-    return Response(content=buf.getvalue(), media_type="image/png")
+    return buf.getvalue()
+
+@app.get("/forecast/plot")
+def get_forecast_plot(shopping_mall: str, region: str, category: str):
+    if forecast_df.empty or daily_sales_df.empty:
+        return Response(content="Data not found. Please run the forecasting script first.", status_code=404)
+
+    # --- CHANGE: Inputs are static between forecast runs, so each group's PNG is rendered once ---
+    png = _render_forecast_png(shopping_mall, region, category)
+    if png is None:
+        return Response(content="No data available for the selected criteria.", status_code=404)
+
+    return Response(content=png, media_type="image/png")
+
+@app.post("/admin/flush")
+def flush_forecast_cache():
+    """Reload forecast.py's outputs (history and forecast) and drop cached plots; call after re-running it."""
+    global daily_sales_df, forecast_df
+    # forecast.py rewrites the daily history too, so reload it before the plots are rebuilt
+    try:
+        daily_sales_df = load_daily_sales()
+    except FileNotFoundError:
+        daily_sales_df = pd.DataFrame()
+    try:
+        forecast_df = load_table('sales_forecast', 'forecast_date', '%Y-%m-%d').set_index(GROUP_KEYS).sort_index()
+    except FileNotFoundError:
+        forecast_df = pd.DataFrame()
+    _render_forecast_png.cache_clear()
+    return {"message": "Forecast cache cleared."}
 
 if __name__ == '__main__':
     uvicorn.run(app, host="0.0.0.0", port=8090)
\ No newline at end of file
@@ -1,6 +1,11 @@
 import pandas as pd
+import numpy as np
 from prophet import Prophet
 import warnings
+import os
+from concurrent.futures import ProcessPoolExecutor
+import pyarrow as pa
+import pyarrow.parquet as pq
 
 # Suppress informational messages from Prophet
 import logging
@@ -8,69 +13,54 @@ logging.getLogger('cmdstanpy').setLevel(logging.WARNING)
 
 warnings.filterwarnings("ignore")
 
-# Load the datasets
-try:
-    shopping_data = pd.read_csv('customer_shopping_data.csv')
-    region_data = pd.read_csv('Region_detail_table.csv')
-except FileNotFoundError:
-    print("Make sure 'customer_shopping_data.csv' and 'Region_detail_table.csv' are in the same directory as this script.")
-    exit()
+GROUP_KEYS = ['shopping_mall', 'Region', 'category']
 
-# Merge the datasets
-df = pd.merge(shopping_data, region_data, on='shopping_mall')
-
-# Data Preprocessing
-df['invoice_date'] = pd.to_datetime(df['invoice_date'], dayfirst=True)
-df['sales'] = df['price'] * df['quantity']
-
-# Group data and create time series
-df_grouped = df.groupby(['shopping_mall', 'Region', 'category', 'invoice_date']).agg({'sales': 'sum'}).reset_index()
-
-# Get all unique combinations of shopping_mall, Region, and category
-groups = df_grouped[['shopping_mall', 'Region', 'category']].drop_duplicates().to_dict('records')
-
-all_forecasts = []
+# Explicit schema for the raw transactions so the PyArrow reader skips type inference
+# (the group keys are categoricals so grouping works on integer codes); only these
+# columns (plus invoice_date, parsed separately) are read at all
+SHOPPING_DTYPES = {'shopping_mall': 'category', 'category': 'category', 'quantity': 'int32', 'price': 'float64'}
+SHOPPING_COLUMNS = [*SHOPPING_DTYPES, 'invoice_date']
 
 # Forecast for the next 90 days (3 months)
-forecast_steps = 90
+FORECAST_STEPS = 90
 
-print("Starting forecasting with enhanced Facebook Prophet...")
+# Output schema, fixed up front so forecasts can be streamed to Parquet one group at a time
+FORECAST_SCHEMA = pa.schema([
+    ('shopping_mall', pa.string()),
+    ('Region', pa.string()),
+    ('category', pa.string()),
+    ('forecast_date', pa.timestamp('ns')),
+    ('forecasted_sales', pa.float64()),
+])
 
-for group in groups:
-    mall = group['shopping_mall']
-    region = group['Region']
-    category = group['category']
 
-    # Filter data for the current group
-    group_df = df_grouped[(df_grouped['shopping_mall'] == mall) &
-                          (df_grouped['Region'] == region) &
-                          (df_grouped['category'] == category)]
+def _init_worker():
+    """Keep each worker's Stan backend single-threaded so the processes don't oversubscribe the cores."""
+    os.environ['OMP_NUM_THREADS'] = '1'
 
-    if group_df.shape[0] < 10: # Increased minimum data points for better modeling
-        print(f"Skipping forecast for {mall} - {region} - {category} due to insufficient data.")
-        continue
 
-    # Prepare data for Prophet (requires 'ds' and 'y' columns)
-    prophet_df = group_df[['invoice_date', 'sales']].rename(columns={
-        'invoice_date': 'ds',
-        'sales': 'y'
-    })
+def _fit_one(category, prophet_df, forecast_steps):
+    """Fit Prophet on one category's daily ds/y series and return its forecast, or None if skipped."""
+    if prophet_df.shape[0] < 10: # Increased minimum data points for better modeling
+        print(f"Skipping forecast for {category} due to insufficient data.")
+        return None
+
+    # Yearly Fourier terms are only identifiable with more than a year of history
+    spans_year = (prophet_df['ds'].max() - prophet_df['ds'].min()).days > 365
 
     try:
         # --- NEW: Initialize Prophet with enhanced parameters ---
         model = Prophet(
             seasonality_mode='multiplicative',  # Use multiplicative seasonality for sales data
             changepoint_prior_scale=0.1,        # Increase trend flexibility
-            yearly_seasonality=True,
-            weekly_seasonality=True
+            yearly_seasonality=spans_year,
+            weekly_seasonality=True,
+            uncertainty_samples=0               # Only yhat is used, so skip the posterior sampling in predict()
         )
 
         # Add country-specific holidays (assuming data is from Turkey)
         model.add_country_holidays(country_name='TR')
 
-        # Add a custom monthly seasonality
-        model.add_seasonality(name='monthly', period=30.5, fourier_order=5)
-
         # Fit the model
         model.fit(prophet_df)
 
@@ -88,25 +78,126 @@ for group in groups:
         forecast_dates = pd.date_range(start=max_date + pd.Timedelta(days=1), periods=forecast_steps)
 
         # Create a dataframe for the forecast
-        forecast_df_out = pd.DataFrame({
-            'shopping_mall': mall,
-            'Region': region,
-            'category': category,
+        return pd.DataFrame({
             'forecast_date': forecast_dates,
             'forecasted_sales': forecasted_values
         })
-        all_forecasts.append(forecast_df_out)
 
     except Exception as e:
-        print(f"Could not forecast for {mall} - {region} - {category}: {e}")
-
-# Concatenate all forecasts
-if all_forecasts:
-    final_forecast_df = pd.concat(all_forecasts, ignore_index=True)
-    # Ensure forecasted sales are not negative
-    final_forecast_df['forecasted_sales'] = final_forecast_df['forecasted_sales'].clip(lower=0)
-    # Save forecasts to a CSV file
-    final_forecast_df.to_csv('sales_forecast.csv', index=False)
-    print("\nForecasting complete. Forecasts saved to sales_forecast.csv")
-else:
-    print("\nNo forecasts were generated.")
\ No newline at end of file
+        print(f"Could not forecast for {category}: {e}")
+        return None
+
+
+def daily_group_sales(df):
+    """Sum sales per (mall, region, category, day) with one np.bincount over the observed packed keys.
+
+    Rows come out ordered by group keys (category order) and then date, matching a sorted groupby.
+    """
+    codes = [df[key].cat.codes.to_numpy() for key in GROUP_KEYS]
+    date_codes, dates = pd.factorize(df['invoice_date'], sort=True)
+    codes.append(date_codes)
+    # Rows with an unknown mall/region or missing date have a -1 code and belong to no group
+    valid = np.logical_and.reduce([c >= 0 for c in codes])
+    dims = tuple(len(df[key].cat.categories) for key in GROUP_KEYS) + (len(dates),)
+    group_ids = np.ravel_multi_index([c[valid] for c in codes], dims)
+
+    # Number the observed groups only, so memory follows them rather than the full key product
+    observed, group_index = np.unique(group_ids, return_inverse=True)
+    sales = np.bincount(group_index, weights=df['sales'].to_numpy()[valid])
+    key_codes = np.unravel_index(observed, dims)
+
+    daily = {key: pd.Categorical.from_codes(key_codes[i], dtype=df[key].dtype) for i, key in enumerate(GROUP_KEYS)}
+    daily['invoice_date'] = dates[key_codes[-1]]
+    daily['sales'] = sales
+    return pd.DataFrame(daily)
+
+
+def main():
+    # Load the datasets
+    try:
+        shopping_data = pd.read_csv('customer_shopping_data.csv', engine='pyarrow', usecols=SHOPPING_COLUMNS, dtype=SHOPPING_DTYPES)
+        region_data = pd.read_csv('Region_detail_table.csv')
+    except FileNotFoundError:
+        print("Make sure 'customer_shopping_data.csv' and 'Region_detail_table.csv' are in the same directory as this script.")
+        return
+
+    # Attach each mall's region with a lookup instead of materializing a merged frame
+    df = shopping_data
+    mall_to_region = dict(zip(region_data['shopping_mall'], region_data['Region']))
+    df['Region'] = df['shopping_mall'].map(mall_to_region).astype('category')
+
+    # Data Preprocessing
+    df['invoice_date'] = pd.to_datetime(df['invoice_date'], format='%d-%m-%Y', cache=True)
+    df['sales'] = df['price'] * df['quantity']
+
+    # Group data and create time series
+    df_grouped = daily_group_sales(df)
+
+    # Persist the daily series so the dashboard can load it without re-aggregating the raw data;
+    # written aside and renamed so a running dashboard never reads a partial file
+    tmp_path = f'daily_by_mrc.{os.getpid()}.tmp'
+    df_grouped.to_parquet(tmp_path, engine='pyarrow', compression='snappy', index=False)
+    os.replace(tmp_path, 'daily_by_mrc.parquet')
+
+    # --- CHANGE: Top-down forecasting. Groups share holidays and seasonality, so fit one model per
+    # category on its daily total and split it across the category's (mall, region) groups by their
+    # share of its historical sales. Sparse groups get a forecast too instead of being skipped ---
+    category_daily = df_grouped.groupby(['category', 'invoice_date'], observed=True)['sales'].sum().reset_index()
+    # Prepare data for Prophet (requires 'ds' and 'y' columns)
+    prophet_input = category_daily.rename(columns={'invoice_date': 'ds', 'sales': 'y'})
+    group_totals = df_grouped.groupby(GROUP_KEYS, observed=True)['sales'].sum()
+    group_shares = group_totals / group_totals.groupby(level='category', observed=True).transform('sum')
+
+    print("Starting forecasting with enhanced Facebook Prophet...")
+
+    # Categories are independent and CPU-bound, so fit them in parallel processes
+    with ProcessPoolExecutor(max_workers=os.cpu_count(), initializer=_init_worker) as executor:
+        futures = {category: executor.submit(_fit_one, category, category_df[['ds', 'y']], FORECAST_STEPS)
+                   for category, category_df in prophet_input.groupby('category', observed=True, sort=False)}
+        category_forecasts = {category: future.result() for category, future in futures.items()}
+
+    # Each group's forecast is appended to the outputs as soon as it is built (in key order, so the
+    # files are stable between runs) rather than held until one final concat. Both are written under
+    # temporary names and renamed into place at the end, so readers never see a partial file
+    parquet_tmp = f'sales_forecast.parquet.{os.getpid()}.tmp'
+    csv_tmp = f'sales_forecast.csv.{os.getpid()}.tmp'
+    writer = None
+    csv_file = None
+    groups_written = 0
+    try:
+        for (mall, region, category), share in group_shares.items():
+            category_forecast = category_forecasts.get(category)
+            if category_forecast is None:
+                continue
+            forecast_df_out = pd.DataFrame({
+                'shopping_mall': mall,
+                'Region': region,
+                'category': category,
+                'forecast_date': category_forecast['forecast_date'],
+                # Ensure forecasted sales are not negative
+                'forecasted_sales': category_forecast['forecasted_sales'].clip(lower=0) * share
+            })
+
+            # Save forecasts to a CSV file, plus the Parquet copy the dashboard loads
+            if writer is None:
+                writer = pq.ParquetWriter(parquet_tmp, FORECAST_SCHEMA, compression='snappy')
+                csv_file = open(csv_tmp, 'w', newline='')
+            writer.write_table(pa.Table.from_pandas(forecast_df_out, schema=FORECAST_SCHEMA, preserve_index=False))
+            forecast_df_out.to_csv(csv_file, header=groups_written == 0, index=False)
+            groups_written += 1
+    finally:
+        if writer is not None:
+            csv_file.close()
+            writer.close()
+
+    if groups_written:
+        # CSV first, then Parquet: the dashboard only re-parses the CSV when it is newer than the Parquet
+        os.replace(csv_tmp, 'sales_forecast.csv')
+        os.replace(parquet_tmp, 'sales_forecast.parquet')
+        print("\nForecasting complete. Forecasts saved to sales_forecast.csv and sales_forecast.parquet")
+    else:
+        print("\nNo forecasts were generated.")
+
+
+if __name__ == "__main__":
+    main()
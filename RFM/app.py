@@ -1,51 +1,66 @@
 import pandas as pd
+import numpy as np
 import seaborn as sns
 import matplotlib.pyplot as plt
 from fastapi import FastAPI, Request
-from fastapi.responses import HTMLResponse, StreamingResponse
+from fastapi.responses import HTMLResponse, Response
 import datetime as dt
 import traceback
 import io
+import hashlib
+from pathlib import Path
 
 # --- App Configuration ---
 app = FastAPI()
 sns.set_theme(style="whitegrid")
 
 # --- RFM Analysis Logic (Robust Version) ---
+# Explicit schema for the raw transactions so the PyArrow reader skips type inference;
+# only these columns (plus invoice_date, parsed separately) are read at all
+SHOPPING_DTYPES = {'invoice_no': 'str', 'customer_id': 'str', 'quantity': 'int32', 'price': 'float64'}
+SHOPPING_COLUMNS = [*SHOPPING_DTYPES, 'invoice_date']
+
+# RFM_Score bins for each segment: <=4 Lost, 5-6 At-Risk, 7-8 Potential, 9-10 Loyal, 11+ Champions
+SEGMENT_BINS = [-np.inf, 4, 6, 8, 10, np.inf]
+SEGMENT_LABELS = ['Lost Customers', 'At-Risk Customers', 'Potential Loyalists', 'Loyal Customers', 'Champions']
+
+# Part of the RFM cache file name; bump it whenever the table's columns, dtypes or segments change
+RFM_CACHE_VERSION = 2
+
+def qscore(x, labels):
+    """Quartile-style int8 scores matching pd.qcut's right-closed bins, via np.quantile + searchsorted."""
+    edges = np.quantile(x, np.linspace(0, 1, len(labels) + 1))
+    bins = np.clip(np.searchsorted(edges, x, side='left') - 1, 0, len(labels) - 1)
+    return np.asarray(labels, dtype='int8')[bins]
+
 def perform_rfm_analysis(file_path: str):
     try:
-        df = pd.read_csv(file_path)
-        df['invoice_date'] = pd.to_datetime(df['invoice_date'], format='%d-%m-%Y', errors='coerce')
+        df = pd.read_csv(file_path, engine='pyarrow', usecols=SHOPPING_COLUMNS, dtype=SHOPPING_DTYPES)
+        df['invoice_date'] = pd.to_datetime(df['invoice_date'], format='%d-%m-%Y', errors='coerce', cache=True)
         df.dropna(subset=['invoice_date'], inplace=True)
         df['total_price'] = df['quantity'] * df['price']
         
         snapshot_date = df['invoice_date'].max() + dt.timedelta(days=1)
-        rfm = df.groupby('customer_id').agg({
-            'invoice_date': lambda date: (snapshot_date - date.max()).days,
-            'invoice_no': 'count',
-            'total_price': 'sum'
-        }).rename(columns={
-            'invoice_date': 'Recency', 'invoice_no': 'Frequency', 'total_price': 'MonetaryValue'
-        })
+        # Days since each purchase in one int32 pass; a customer's Recency is then the minimum
+        df['recency_days'] = (snapshot_date - df['invoice_date']).dt.days.astype('int32')
+        rfm = df.groupby('customer_id').agg(
+            Recency=('recency_days', 'min'),
+            Frequency=('invoice_no', 'count'),
+            MonetaryValue=('total_price', 'sum')
+        )
 
         r_labels, f_labels, m_labels = range(4, 0, -1), range(1, 5), range(1, 5)
         
-        rfm['R_Score'] = pd.qcut(rfm['Recency'], q=4, labels=r_labels, duplicates='drop')
-        rfm['F_Score'] = pd.qcut(rfm['Frequency'].rank(method='first'), q=4, labels=f_labels, duplicates='drop')
-        rfm['M_Score'] = pd.qcut(rfm['MonetaryValue'], q=4, labels=m_labels, duplicates='drop')
-
-        rfm['R_Score'] = rfm['R_Score'].astype(int)
-        rfm['F_Score'] = rfm['F_Score'].astype(int)
-        rfm['M_Score'] = rfm['M_Score'].astype(int)
-        rfm['RFM_Score'] = rfm[['R_Score', 'F_Score', 'M_Score']].sum(axis=1)
-
-        def assign_segment(score):
-            if score >= 11: return 'Champions'
-            elif score >= 9: return 'Loyal Customers'
-            elif score >= 7: return 'Potential Loyalists'
-            elif score >= 5: return 'At-Risk Customers'
-            else: return 'Lost Customers'
-        rfm['Segment'] = rfm['RFM_Score'].apply(assign_segment)
+        rfm['R_Score'] = qscore(rfm['Recency'].to_numpy(), r_labels)
+        rfm['F_Score'] = qscore(rfm['Frequency'].rank(method='first').to_numpy(), f_labels)
+        rfm['M_Score'] = qscore(rfm['MonetaryValue'].to_numpy(), m_labels)
+        rfm['RFM_Score'] = rfm[['R_Score', 'F_Score', 'M_Score']].sum(axis=1).astype('int8')
+
+        rfm['Segment'] = pd.cut(rfm['RFM_Score'], bins=SEGMENT_BINS, labels=SEGMENT_LABELS)
+
+        # Scores fit in int8 and the five segments in a categorical; shrink the counts too
+        rfm['Recency'] = pd.to_numeric(rfm['Recency'], downcast='integer')
+        rfm['Frequency'] = pd.to_numeric(rfm['Frequency'], downcast='integer')
 
         return rfm.reset_index()
     except Exception:
@@ -53,12 +68,36 @@ def perform_rfm_analysis(file_path: str):
         print(traceback.format_exc())
         return None
 
+def load_rfm(file_path: str):
+    """Return the RFM table, reusing the Parquet cache written for the current version of the CSV."""
+    csv_path = Path(file_path)
+    if not csv_path.exists():
+        print(f"💥 Data file not found: {csv_path}")
+        return None
+    cache_path = csv_path.with_name(f".rfm_cache_v{RFM_CACHE_VERSION}_{int(csv_path.stat().st_mtime)}.parquet")
+    if cache_path.exists():
+        return pd.read_parquet(cache_path)
+
+    rfm = perform_rfm_analysis(file_path)
+    if rfm is not None:
+        # Caches for older versions of the CSV or of this table are never read again
+        for stale in csv_path.parent.glob(".rfm_cache_*.parquet"):
+            stale.unlink()
+        rfm.to_parquet(cache_path, compression='zstd', index=False)
+    return rfm
+
 # --- Server Startup ---
 @app.on_event("startup")
 async def startup_event():
     print("🚀 Server starting up... Performing RFM analysis.")
-    app.state.rfm_df = perform_rfm_analysis("customer_shopping_data.csv")
+    app.state.rfm_df = load_rfm("customer_shopping_data.csv")
     if app.state.rfm_df is not None:
+        # The segment chart only needs the counts, so reduce them once here (occurring segments only;
+        # Segment is categorical, so value_counts would list empty segments too)
+        app.state.segment_counts = app.state.rfm_df['Segment'].value_counts()[lambda counts: counts > 0]
+        # Render both PNGs up front so requests never touch Matplotlib
+        app.state.png_segments = render_segments_chart()
+        app.state.png_distributions = render_distributions_chart()
         print(f"✅ RFM analysis complete. {len(app.state.rfm_df)} customers loaded.")
     else:
         print("❌ RFM analysis failed. Please check the error message above.")
@@ -70,35 +109,57 @@ async def serve_dashboard():
     with open("index.html") as f:
         return f.read()
 
-def plot_to_png_response(fig):
-    """Saves a matplotlib figure to a PNG in memory and returns a StreamingResponse."""
+def plot_to_png(fig):
+    """Saves a matplotlib figure to PNG bytes in memory and releases the figure."""
     buf = io.BytesIO()
-    fig.savefig(buf, format="png", bbox_inches='tight')
-    buf.seek(0)
-    return StreamingResponse(buf, media_type="image/png")
+    fig.savefig(buf, format="png", dpi=100, bbox_inches='tight')
+    plt.close(fig)
+    return buf.getvalue()
+
+def png_response(request: Request, png: bytes, etag: str):
+    """Returns cached PNG bytes, or 304 Not Modified if the client already holds this version."""
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    return Response(content=png, media_type="image/png", headers={"ETag": etag})
+
+def make_etag(body: bytes):
+    return f'"{hashlib.md5(body).hexdigest()}"'
+
+# rfm_df never changes after startup, so each chart is rendered once there and served from memory
+def render_segments_chart():
+    segment_counts = app.state.segment_counts
+    fig, ax = plt.subplots(figsize=(10, 6), layout='constrained')
+    colors = plt.get_cmap('viridis')(np.linspace(0, 1, len(segment_counts)))
+    ax.bar(segment_counts.index.to_numpy(), segment_counts.to_numpy(), color=colors)
+    ax.set_xlabel('Segment')
+    ax.set_ylabel('count')
+    ax.set_title('Customer Segmentation', fontsize=16)
+    ax.tick_params(axis='x', rotation=45)
+    png = plot_to_png(fig)
+    return png, make_etag(png)
+
+def render_distributions_chart():
+    rfm_df = app.state.rfm_df
+    fig, axes = plt.subplots(3, 1, figsize=(10, 15), layout='constrained')
+    fig.suptitle('RFM Distributions', fontsize=20)
+    
+    sns.histplot(ax=axes[0], data=rfm_df, x='Recency', kde=True).set_title('Recency (Days)')
+    sns.histplot(ax=axes[1], data=rfm_df, x='Frequency', kde=True).set_title('Frequency (Purchases)')
+    sns.histplot(ax=axes[2], data=rfm_df, x='MonetaryValue', kde=True).set_title('Monetary Value')
+    
+    png = plot_to_png(fig)
+    return png, make_etag(png)
 
 @app.get("/api/charts/segments")
 async def chart_segments(request: Request):
     rfm_df = request.app.state.rfm_df
     if rfm_df is None: return HTMLResponse("Data not available", status_code=500)
     
-    fig, ax = plt.subplots(figsize=(10, 6))
-    sns.countplot(ax=ax, data=rfm_df, x='Segment', order=rfm_df['Segment'].value_counts().index, palette='viridis')
-    ax.set_title('Customer Segmentation', fontsize=16)
-    ax.tick_params(axis='x', rotation=45)
-    return plot_to_png_response(fig)
+    return png_response(request, *request.app.state.png_segments)
 
 @app.get("/api/charts/distributions")
 async def chart_distributions(request: Request):
     rfm_df = request.app.state.rfm_df
     if rfm_df is None: return HTMLResponse("Data not available", status_code=500)
     
-    fig, axes = plt.subplots(3, 1, figsize=(10, 15))
-    fig.suptitle('RFM Distributions', fontsize=20)
-    
-    sns.histplot(ax=axes[0], data=rfm_df, x='Recency', kde=True).set_title('Recency (Days)')
-    sns.histplot(ax=axes[1], data=rfm_df, x='Frequency', kde=True).set_title('Frequency (Purchases)')
-    sns.histplot(ax=axes[2], data=rfm_df, x='MonetaryValue', kde=True).set_title('Monetary Value')
-    
-    plt.tight_layout(rect=[0, 0, 1, 0.96])
-    return plot_to_png_response(fig)
\ No newline at end of file
+    return png_response(request, *request.app.state.png_distributions)
@@ -1,8 +1,12 @@
 import pandas as pd
+import numpy as np
 import plotly.express as px
+import plotly.graph_objects as go
 import plotly.io as pio
 from fastapi import FastAPI, Request
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, Response
+import hashlib
+from functools import lru_cache
 
 # Use a modern, clean Plotly theme
 pio.templates.default = "plotly_white"
@@ -10,6 +14,11 @@ pio.templates.default = "plotly_white"
 # Create the main FastAPI application object
 app = FastAPI()
 
+# The charts only use these columns of the generated RFM table, so the rest is never parsed;
+# the five segments are stored as a categorical
+RFM_DTYPES = {'Recency': 'int32', 'Frequency': 'int32', 'MonetaryValue': 'float64', 'Segment': 'category'}
+RFM_COLUMNS = list(RFM_DTYPES)
+
 # This is a "lifespan event". It runs the code inside once, when the app starts.
 @app.on_event("startup")
 async def startup_event():
@@ -19,9 +28,14 @@ async def startup_event():
     """
     try:
         # Load the pre-calculated RFM data
-        rfm_df = pd.read_csv("rfm_analysis.csv")
+        rfm_df = pd.read_csv("rfm_analysis.csv", usecols=RFM_COLUMNS, dtype=RFM_DTYPES)
         # Store the dataframe in the app's state, so all requests can access it
         app.state.rfm_df = rfm_df
+        # Reduce the chart inputs once; the endpoints only assemble figures from these
+        # (segments with no customers are dropped, as with the plain-string Segment column)
+        app.state.segment_counts = rfm_df['Segment'].value_counts()[lambda counts: counts > 0].reset_index()
+        app.state.hist = {col: np.histogram(rfm_df[col].to_numpy(), bins=40)
+                          for col in ('Recency', 'Frequency', 'MonetaryValue')}
         print("✅ RFM data loaded successfully at startup.")
     except FileNotFoundError:
         print("❌ Error: 'rfm_analysis.csv' not found.")
@@ -35,18 +49,26 @@ async def read_root():
     with open("index.html") as f:
         return f.read()
 
-# --- Chart Endpoints ---
+# --- Chart Rendering ---
+# rfm_df never changes after startup, so each chart is serialized once and served from memory
 
-@app.get("/api/charts/segments")
-async def get_segment_chart(request: Request):
-    """Creates and returns the customer segmentation bar chart."""
-    rfm_df = request.app.state.rfm_df
-    if rfm_df is None:
-        return {"error": "Data not loaded"}
-    
-    segment_counts = rfm_df['Segment'].value_counts().reset_index()
+def figure_response(request: Request, body: bytes, etag: str):
+    """Returns cached figure JSON, or 304 Not Modified if the client already holds this version."""
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
+
+
+def serialize_figure(fig):
+    """Encodes a Plotly figure as JSON bytes (via orjson) plus an ETag for that content."""
+    body = fig.to_json(engine="orjson").encode("utf-8")
+    return body, f'"{hashlib.md5(body).hexdigest()}"'
+
+
+@lru_cache(maxsize=None)
+def render_segment_chart():
     fig = px.bar(
-        segment_counts,
+        app.state.segment_counts,
         x='Segment',
         y='count',
         title="Customer Segmentation",
@@ -55,37 +77,56 @@ async def get_segment_chart(request: Request):
         labels={'count': 'Number of Customers', 'Segment': 'Customer Segment'}
     )
     fig.update_layout(xaxis={'categoryorder':'total descending'}, showlegend=False)
-    return fig.to_dict()
+    return serialize_figure(fig)
+
+
+@lru_cache(maxsize=None)
+def render_histogram(column, title):
+    counts, edges = app.state.hist[column]
+    fig = go.Figure(go.Bar(x=(edges[:-1] + edges[1:]) / 2, y=counts, width=np.diff(edges)))
+    fig.update_layout(title=title, xaxis_title=column, yaxis_title='count', bargap=0)
+    return serialize_figure(fig)
+
+
+# --- Chart Endpoints ---
+# Plain `def` handlers: the first request for each chart builds the figure, and FastAPI runs sync handlers
+# on its threadpool so that work never stalls the event loop
+
+@app.get("/api/charts/segments")
+def get_segment_chart(request: Request):
+    """Creates and returns the customer segmentation bar chart."""
+    rfm_df = request.app.state.rfm_df
+    if rfm_df is None:
+        return {"error": "Data not loaded"}
+    
+    return figure_response(request, *render_segment_chart())
 
 
 @app.get("/api/charts/recency")
-async def get_recency_chart(request: Request):
+def get_recency_chart(request: Request):
     """Creates and returns the Recency histogram."""
     rfm_df = request.app.state.rfm_df
     if rfm_df is None:
         return {"error": "Data not loaded"}
 
-    fig = px.histogram(rfm_df, x="Recency", title="Recency (Days) Distribution", nbins=40)
-    return fig.to_dict()
+    return figure_response(request, *render_histogram("Recency", "Recency (Days) Distribution"))
 
 
 @app.get("/api/charts/frequency")
-async def get_frequency_chart(request: Request):
+def get_frequency_chart(request: Request):
     """Creates and returns the Frequency histogram."""
     rfm_df = request.app.state.rfm_df
     if rfm_df is None:
         return {"error": "Data not loaded"}
 
-    fig = px.histogram(rfm_df, x="Frequency", title="Frequency (Purchases) Distribution", nbins=40)
-    return fig.to_dict()
+    return figure_response(request, *render_histogram("Frequency", "Frequency (Purchases) Distribution"))
 
 
 @app.get("/api/charts/monetary")
-async def get_monetary_chart(request: Request):
+def get_monetary_chart(request: Request):
     """Creates and returns the Monetary Value histogram."""
     rfm_df = request.app.state.rfm_df
     if rfm_df is None:
         return {"error": "Data not loaded"}
         
-    fig = px.histogram(rfm_df, x="MonetaryValue", title="Monetary Value Distribution", nbins=40)
-    return fig.to_dict()
\ No newline at end of file
+    return figure_response(request, *render_histogram("MonetaryValue", "Monetary Value Distribution"))
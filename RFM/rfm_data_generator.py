@@ -1,56 +1,60 @@
 import pandas as pd
+import numpy as np
 import datetime as dt
 
+# Explicit schema for the raw transactions so the PyArrow reader skips type inference;
+# only these columns (plus invoice_date, parsed separately) are read at all
+SHOPPING_DTYPES = {'invoice_no': 'str', 'customer_id': 'str', 'quantity': 'int32', 'price': 'float64'}
+SHOPPING_COLUMNS = [*SHOPPING_DTYPES, 'invoice_date']
+
+# RFM_Score bins for each segment: <=4 Lost, 5-6 At-Risk, 7-8 Potential, 9-10 Loyal, 11+ Champions
+SEGMENT_BINS = [-np.inf, 4, 6, 8, 10, np.inf]
+SEGMENT_LABELS = ['Lost Customers', 'At-Risk Customers', 'Potential Loyalists', 'Loyal Customers', 'Champions']
+
+def qscore(x, labels):
+    """Quartile-style int8 scores matching pd.qcut's right-closed bins, via np.quantile + searchsorted."""
+    edges = np.quantile(x, np.linspace(0, 1, len(labels) + 1))
+    bins = np.clip(np.searchsorted(edges, x, side='left') - 1, 0, len(labels) - 1)
+    return np.asarray(labels, dtype='int8')[bins]
+
 def generate_rfm_data():
     """
     Performs RFM analysis and saves the results to a CSV file with clean data types.
     """
     try:
-        df = pd.read_csv('customer_shopping_data.csv')
+        df = pd.read_csv('customer_shopping_data.csv', engine='pyarrow', usecols=SHOPPING_COLUMNS, dtype=SHOPPING_DTYPES)
     except FileNotFoundError:
         print("Error: 'customer_shopping_data.csv' not found.")
         print("Please make sure the data file is in the same directory.")
         return
 
-    df['invoice_date'] = pd.to_datetime(df['invoice_date'], format='%d-%m-%Y')
+    df['invoice_date'] = pd.to_datetime(df['invoice_date'], format='%d-%m-%Y', cache=True)
     df['total_price'] = df['quantity'] * df['price']
     snapshot_date = df['invoice_date'].max() + dt.timedelta(days=1)
     
-    rfm = df.groupby('customer_id').agg({
-        'invoice_date': lambda date: (snapshot_date - date.max()).days,
-        'invoice_no': 'count',
-        'total_price': 'sum'
-    })
-    rfm.rename(columns={'invoice_date': 'Recency',
-                        'invoice_no': 'Frequency',
-                        'total_price': 'MonetaryValue'}, inplace=True)
+    # Days since each purchase in one int32 pass; a customer's Recency is then the minimum
+    df['recency_days'] = (snapshot_date - df['invoice_date']).dt.days.astype('int32')
+    rfm = df.groupby('customer_id').agg(
+        Recency=('recency_days', 'min'),
+        Frequency=('invoice_no', 'count'),
+        MonetaryValue=('total_price', 'sum')
+    )
 
     r_labels = range(4, 0, -1)
     f_labels = range(1, 5)
     m_labels = range(1, 5)
 
-    rfm['R_Score'] = pd.qcut(rfm['Recency'], q=4, labels=r_labels)
-    rfm['F_Score'] = pd.qcut(rfm['Frequency'].rank(method='first'), q=4, labels=f_labels)
-    rfm['M_Score'] = pd.qcut(rfm['MonetaryValue'], q=4, labels=m_labels)
-    rfm['RFM_Score'] = rfm[['R_Score', 'F_Score', 'M_Score']].sum(axis=1)
-
-    def assign_segment(score):
-        if score >= 11: return 'Champions'
-        elif score >= 9: return 'Loyal Customers'
-        elif score >= 7: return 'Potential Loyalists'
-        elif score >= 5: return 'At-Risk Customers'
-        else: return 'Lost Customers'
-    rfm['Segment'] = rfm['RFM_Score'].apply(assign_segment)
-
-    # --- FIX APPLIED HERE ---
-    # Convert special pandas data types to standard Python types.
-    # This prevents serialization errors in the web app.
-    rfm['R_Score'] = rfm['R_Score'].astype(int)
-    rfm['F_Score'] = rfm['F_Score'].astype(int)
-    rfm['M_Score'] = rfm['M_Score'].astype(int)
-    rfm['RFM_Score'] = rfm['RFM_Score'].astype(int)
-    rfm['Segment'] = rfm['Segment'].astype(str)
-    
+    rfm['R_Score'] = qscore(rfm['Recency'].to_numpy(), r_labels)
+    rfm['F_Score'] = qscore(rfm['Frequency'].rank(method='first').to_numpy(), f_labels)
+    rfm['M_Score'] = qscore(rfm['MonetaryValue'].to_numpy(), m_labels)
+    rfm['RFM_Score'] = rfm[['R_Score', 'F_Score', 'M_Score']].sum(axis=1).astype('int8')
+
+    rfm['Segment'] = pd.cut(rfm['RFM_Score'], bins=SEGMENT_BINS, labels=SEGMENT_LABELS)
+
+    # Scores fit in int8 and the five segments in a categorical; shrink the counts too
+    rfm['Recency'] = pd.to_numeric(rfm['Recency'], downcast='integer')
+    rfm['Frequency'] = pd.to_numeric(rfm['Frequency'], downcast='integer')
+
     rfm.to_csv('rfm_analysis.csv')
     print(f"✅ RFM analysis data for {len(rfm)} customers saved to 'rfm_analysis.csv' with corrected data types.")
 